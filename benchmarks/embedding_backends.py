@@ -0,0 +1,206 @@
+"""Parity, latency and memory of the torch and ONNX embedding backends.
+
+Each backend runs in a fresh interpreter so its resident memory is measured
+on its own: RSS after loading the model and peak RSS after embedding. In
+each run the dataset's stored texts (``content`` + ``fact``, as ingested)
+are embedded in batches, and single titles are embedded one at a time for
+query latency. The ONNX embeddings are then compared row by row with the
+torch ones (cosine agreement), together with how often the nearest
+neighbour of each title stays the same.
+
+    python -m benchmarks.embedding_backends --threads 4 --output embedding_backends.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+import numpy as np
+from hoax_detect.config import settings
+from hoax_detect.services.utils import l2_normalize
+
+BACKENDS = {
+    "torch": {"EMBEDDING_BACKEND": "torch"},
+    "onnx-int8": {"EMBEDDING_BACKEND": "onnx", "ONNX_QUANTIZED": "true"},
+    "onnx-fp32": {"EMBEDDING_BACKEND": "onnx", "ONNX_QUANTIZED": "false"},
+}
+
+
+def rss_mb() -> float:
+    """Current resident set size in MiB."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def peak_rss_mb() -> float:
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _texts(dataset: str, sample: int):
+    import pandas as pd
+    from hoax_detect.data.loader import clean_frame
+
+    df = clean_frame(pd.read_csv(dataset)).reset_index(drop=True)
+    if sample and sample < len(df):
+        df = df.head(sample)
+    return df["text"].tolist(), df["title"].tolist()
+
+
+def worker(args) -> None:
+    """Measure one backend (configured through the environment) in this process."""
+    from hoax_detect.services import embedding
+
+    texts, titles = _texts(args.dataset, args.sample)
+    baseline = rss_mb()
+    start = time.perf_counter()
+    embedding.get_model()
+    load_seconds = time.perf_counter() - start
+    loaded = rss_mb()
+
+    embedding.embed_batch(titles[:8])
+    single: List[float] = []
+    title_embeddings = []
+    for title in titles[: args.queries]:
+        start = time.perf_counter()
+        title_embeddings.append(embedding.embed_batch([title])[0])
+        single.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    documents = embedding.embed_batch(texts)
+    batch_seconds = time.perf_counter() - start
+
+    np.save(args.embeddings_out, documents)
+    np.save(
+        args.embeddings_out.replace(".npy", "_titles.npy"), np.vstack(title_embeddings)
+    )
+    ms = np.asarray(single) * 1000
+    print(
+        json.dumps(
+            {
+                "load_seconds": round(load_seconds, 2),
+                "rss_baseline_mb": round(baseline, 1),
+                "rss_model_mb": round(loaded - baseline, 1),
+                "rss_after_load_mb": round(loaded, 1),
+                "rss_peak_mb": round(peak_rss_mb(), 1),
+                "query_p50_ms": round(float(np.percentile(ms, 50)), 2),
+                "query_p95_ms": round(float(np.percentile(ms, 95)), 2),
+                "batch_texts_per_second": round(len(texts) / batch_seconds, 1),
+                "batch_seconds": round(batch_seconds, 2),
+            }
+        )
+    )
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """Row-wise cosine similarity between two embedding matrices."""
+    cosine = np.sum(l2_normalize(reference) * l2_normalize(candidate), axis=1)
+    return {
+        "mean": round(float(cosine.mean()), 5),
+        "min": round(float(cosine.min()), 5),
+        "p1": round(float(np.percentile(cosine, 1)), 5),
+        "share_above_0.99": round(float(np.mean(cosine >= 0.99)), 4),
+    }
+
+
+def neighbour_agreement(
+    ref_docs: np.ndarray, ref_queries: np.ndarray, docs: np.ndarray, queries: np.ndarray
+) -> float:
+    """Share of queries whose top-1 document is the same under both backends."""
+    ref_top = np.argmax(l2_normalize(ref_queries) @ l2_normalize(ref_docs).T, axis=1)
+    top = np.argmax(l2_normalize(queries) @ l2_normalize(docs).T, axis=1)
+    return round(float(np.mean(ref_top == top)), 4)
+
+
+def run_backend(name: str, args, tmp: str) -> Dict:
+    env = {**os.environ, **BACKENDS[name]}
+    if args.threads:
+        env["ONNX_INTRA_OP_THREADS"] = str(args.threads)
+        env.setdefault("OMP_NUM_THREADS", str(args.threads))
+    out = os.path.join(tmp, f"{name}.npy")
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.embedding_backends",
+        "--worker",
+        "--dataset",
+        args.dataset,
+        "--sample",
+        str(args.sample),
+        "--queries",
+        str(args.queries),
+        "--embeddings-out",
+        out,
+    ]
+    result = subprocess.run(command, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"error": result.stderr.strip()[-500:]}
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    stats["embeddings"] = out
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding backends")
+    parser.add_argument(
+        "--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS)
+    )
+    parser.add_argument("--dataset", default=settings.DATASET_PATH)
+    parser.add_argument("--sample", type=int, default=0, help="Rows to embed (0 = all)")
+    parser.add_argument("--queries", type=int, default=200, help="Single-query timings")
+    parser.add_argument(
+        "--threads", type=int, default=0, help="Intra-op threads (0 = default)"
+    )
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--embeddings-out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    report: Dict = {
+        "config": {
+            "model": settings.EMBEDDING_MODEL,
+            "dataset": args.dataset,
+            "sample": args.sample,
+            "threads": args.threads or "default",
+            "batch_size": settings.EMBEDDING_BATCH_SIZE,
+        },
+        "backends": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.backends:
+            report["backends"][name] = run_backend(name, args, tmp)
+
+        reference = report["backends"].get("torch", {}).get("embeddings")
+        for name, stats in report["backends"].items():
+            path = stats.pop("embeddings", None)
+            if name == "torch" or not (reference and path):
+                continue
+            ref_docs, docs = np.load(reference), np.load(path)
+            ref_titles = np.load(reference.replace(".npy", "_titles.npy"))
+            titles = np.load(path.replace(".npy", "_titles.npy"))
+            stats["cosine_vs_torch"] = parity(ref_docs, docs)
+            stats["title_cosine_vs_torch"] = parity(ref_titles, titles)
+            stats["top1_neighbour_agreement"] = neighbour_agreement(
+                ref_docs, ref_titles, docs, titles
+            )
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Throughput and memory of the multi-worker server as the worker count grows.
+
+For each worker count the production server (``python -m hoax_detect.serve``)
+is started on a free port, warmed up, and sent ``--requests`` fact checks
+built from the dataset titles at ``--concurrency``. The report gives
+throughput, latency percentiles and errors, plus the memory of the master
+and every worker read from ``/proc/<pid>/smaps_rollup``: RSS, PSS (shared
+pages divided among the processes sharing them, so it adds up to the real
+total) and private memory. With the model and index preloaded the private
+part per worker should stay small while the shared part does not grow.
+
+Responses are not cached during the run. With ``--mock-upstream`` the
+OpenRouter and Tavily calls go to ``benchmarks.mock_upstream``, so no network
+is needed and the API keys can be any placeholder.
+
+    python -m benchmarks.load_test --workers 1 2 4 --requests 400 --concurrency 32 --mock-upstream
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+import numpy as np
+from hoax_detect.config import settings
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def children(pid: int) -> List[int]:
+    found = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            found.extend(int(child) for child in f.read().split())
+    return found
+
+
+def memory_mb(pid: int) -> Dict[str, float]:
+    """RSS, PSS and private memory of one process in MiB."""
+    values: Dict[str, float] = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": round(values.get("Rss", 0), 1),
+        "pss": round(values.get("Pss", 0), 1),
+        "shared": round(
+            values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0), 1
+        ),
+        "private": round(
+            values.get("Private_Clean", 0) + values.get("Private_Dirty", 0), 1
+        ),
+    }
+
+
+def load_queries(n: int, seed: int) -> List[str]:
+    import pandas as pd
+
+    titles = pd.read_csv(settings.DATASET_PATH)["title"].dropna().tolist()
+    rng = random.Random(seed)
+    return [rng.choice(titles) for _ in range(n)]
+
+
+async def wait_ready(base_url: str, process: subprocess.Popen, timeout: float) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=5) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with {process.returncode}")
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise TimeoutError(f"Server not ready after {timeout}s")
+
+
+async def fire(base_url: str, payloads: List[Dict], concurrency: int) -> Dict:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+
+        async def one(payload: Dict) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(f"{base_url}/fact_check", json=payload)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                except Exception as e:
+                    status = getattr(getattr(e, "response", None), "status_code", None)
+                    name = f"HTTP {status}" if status else type(e).__name__
+                    errors[name] = errors.get(name, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(p) for p in payloads))
+        elapsed = time.perf_counter() - start
+
+    ms = np.asarray(latencies or [0]) * 1000
+    return {
+        "requests": len(payloads),
+        "ok": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+    }
+
+
+def run_workers(workers: int, args, env: Dict[str, str], queries: List[str]) -> Dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "hoax_detect.serve",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_ready(base_url, process, args.startup_timeout))
+        payload = {"use_tavily": args.tavily, "fast_path": args.fast_path}
+        # Every worker runs its first forward pass before measuring.
+        asyncio.run(
+            fire(
+                base_url,
+                [{**payload, "query": q} for q in queries[: workers * 4]],
+                workers,
+            )
+        )
+        result = asyncio.run(
+            fire(base_url, [{**payload, "query": q} for q in queries], args.concurrency)
+        )
+        master = memory_mb(process.pid)
+        per_worker = [memory_mb(pid) for pid in children(process.pid)]
+        result["memory_mb"] = {
+            "master": master,
+            "workers": per_worker,
+            "worker_mean": {
+                key: round(float(np.mean([w[key] for w in per_worker])), 1)
+                for key in master
+            }
+            if per_worker
+            else {},
+            "total_pss": round(master["pss"] + sum(w["pss"] for w in per_worker), 1),
+        }
+        return {"workers": workers, **result}
+    except Exception as e:
+        return {"workers": workers, "error": str(e)}
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=settings.SERVE_GRACEFUL_TIMEOUT + 5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def start_mock_upstream(env: Dict[str, str]) -> subprocess.Popen:
+    port = free_port()
+    mock = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_upstream", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    env["OPENROUTER_BASE_URL"] = env["TAVILY_BASE_URL"] = f"http://127.0.0.1:{port}"
+    # The mock has no quota; measure the server rather than the rate limiter.
+    env["OPENROUTER_RATE_LIMIT"] = env["TAVILY_RATE_LIMIT"] = "0"
+    time.sleep(2)
+    return mock
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the multi-worker server")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tavily", action="store_true", help="Include web search")
+    parser.add_argument(
+        "--no-fast-path",
+        dest="fast_path",
+        action="store_false",
+        help="Send every request through the LLM",
+    )
+    parser.add_argument("--mock-upstream", action="store_true")
+    parser.add_argument("--startup-timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    env = {**os.environ, "CACHE_ENABLED": "false", "COALESCE_REQUESTS": "false"}
+    mock = start_mock_upstream(env) if args.mock_upstream else None
+    queries = load_queries(args.requests, args.seed)
+    try:
+        runs = [run_workers(n, args, env, queries) for n in args.workers]
+    finally:
+        if mock is not None:
+            mock.terminate()
+
+    report = {
+        "config": {
+            "embedding_backend": settings.EMBEDDING_BACKEND,
+            "vector_store": settings.VECTOR_STORE_BACKEND,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "tavily": args.tavily,
+            "fast_path": args.fast_path,
+            "cpus": os.cpu_count(),
+        },
+        "runs": runs,
+    }
+    for run in runs:
+        if "error" in run:
+            print(f"{run['workers']:>3} workers  ERROR {run['error']}")
+            continue
+        memory = run["memory_mb"]
+        print(
+            f"{run['workers']:>3} workers  {run['throughput_rps']:>7.1f} req/s  "
+            f"p95 {run['p95_ms']:>7.1f} ms  "
+            f"private/worker {memory['worker_mean'].get('private', 0):>7.1f} MiB  "
+            f"total PSS {memory['total_pss']:>8.1f} MiB"
+        )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Local stand-in for the OpenRouter and Tavily HTTP APIs.
+
+Point the app at it with ``OPENROUTER_BASE_URL=http://127.0.0.1:8900`` and
+``TAVILY_BASE_URL=http://127.0.0.1:8900`` to exercise pooling, retries and
+hedging without network access or API keys.
+
+    python -m benchmarks.mock_upstream --port 8900 --latency 0.2 --error-rate 0.1
+"""
+import argparse
+import asyncio
+import json
+import random
+from typing import Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY = 0.05
+JITTER = 0.0
+ERROR_RATE = 0.0
+RETRY_AFTER = 1
+
+app = FastAPI(title="Mock upstream")
+stats = {"chat": 0, "search": 0, "errors": 0}
+
+
+async def _simulate() -> Optional[JSONResponse]:
+    """Sleep for the configured latency and maybe return an injected error."""
+    await asyncio.sleep(LATENCY + random.uniform(0, JITTER))
+    if random.random() < ERROR_RATE:
+        stats["errors"] += 1
+        status = random.choice([429, 503])
+        headers = {"Retry-After": str(RETRY_AFTER)} if status == 429 else {}
+        return JSONResponse({"error": "injected"}, status_code=status, headers=headers)
+    return None
+
+
+@app.post("/chat/completions")
+async def chat_completions(request: Request):
+    stats["chat"] += 1
+    payload = await request.json()
+    error = await _simulate()
+    if error:
+        return error
+    prompt = payload["messages"][-1]["content"]
+    verdict = "HOAX" if "hoax" in prompt.lower() else "FACT"
+    content = f"Verdict: {verdict}\n\nPenjelasan: respons tiruan untuk pengujian lokal."
+    if payload.get("stream"):
+
+        async def events():
+            for word in content.split(" "):
+                chunk = {"choices": [{"delta": {"content": word + " "}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(LATENCY / 10)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+@app.post("/search")
+async def search(request: Request):
+    stats["search"] += 1
+    payload = await request.json()
+    error = await _simulate()
+    if error:
+        return error
+    query = payload.get("query", "")
+    return {
+        "results": [
+            {
+                "title": f"Hasil {i} untuk {query[:40]}",
+                "url": f"https://turnbackhoax.id/mock/{i}",
+                "content": f"Konten tiruan {i} tentang {query[:80]}",
+                "score": round(1 - i * 0.1, 2),
+            }
+            for i in range(payload.get("num_results", 3))
+        ]
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+def main():
+    global LATENCY, JITTER, ERROR_RATE, RETRY_AFTER
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock OpenRouter/Tavily server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=LATENCY)
+    parser.add_argument("--jitter", type=float, default=JITTER)
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE)
+    parser.add_argument("--retry-after", type=int, default=RETRY_AFTER)
+    args = parser.parse_args()
+
+    LATENCY, JITTER = args.latency, args.jitter
+    ERROR_RATE, RETRY_AFTER = args.error_rate, args.retry_after
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
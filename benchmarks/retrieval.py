@@ -0,0 +1,302 @@
+"""Retrieval quality and latency benchmark over the hoax dataset.
+
+Queries are built from each row's ``title`` in several variants (exact,
+character noise, paraphrase-style rewrites), so the relevant document for
+every query is known. Each query is embedded and run through the production
+``search_similar_chunks_batch`` one at a time, and the report covers recall@k
+and MRR per variant plus p50/p95/p99 latency and QPS end to end and per stage
+(embedding, vector search, lexical fusion, payload fetch), taken from the
+pipeline's own metric spans. Vector-only quality comes from a second, untimed
+pass with hybrid search switched off.
+With ``--classifier`` the pre-filter classifier's separation of claims from
+debunks, confident coverage and inference latency are reported alongside.
+
+Milvus is replaced by the in-process local backend unless ``--backend
+milvus`` is given; the index is built from the dataset (or a precomputed
+artifact) on first run. No network services are contacted.
+
+    python -m benchmarks.retrieval --sample 300 --top-k 5 --output retrieval.json
+"""
+import argparse
+import json
+import os
+import random
+import re
+import time
+from typing import Callable, Dict, List, Sequence
+import numpy as np
+from hoax_detect.config import settings
+
+VARIANTS = ["exact", "noise", "paraphrase"]
+_PREFIXES = ["benarkah", "apakah benar", "katanya", "info:", "cek fakta"]
+_DROPPABLE = {"yang", "dan", "di", "ke", "dari", "untuk", "dengan", "ini", "itu"}
+
+
+def add_noise(text: str, rng: random.Random, rate: float = 0.06) -> str:
+    """Typos: random character drops, swaps and duplications."""
+    chars = list(text)
+    out = []
+    i = 0
+    while i < len(chars):
+        c = chars[i]
+        roll = rng.random()
+        if c.isalpha() and roll < rate / 3:
+            pass
+        elif c.isalpha() and roll < 2 * rate / 3 and i + 1 < len(chars):
+            out.extend([chars[i + 1], c])
+            i += 1
+        elif c.isalpha() and roll < rate:
+            out.extend([c, c])
+        else:
+            out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def paraphrase(text: str, rng: random.Random) -> str:
+    """Cheap rewrite: lower-case, drop function words, add a question prefix."""
+    words = [w for w in re.findall(r"\w+", text.lower()) if w not in _DROPPABLE]
+    if len(words) > 4 and rng.random() < 0.5:
+        cut = rng.randrange(len(words) - 3)
+        words = words[cut:] + words[:cut]
+    return f"{rng.choice(_PREFIXES)} {' '.join(words)}?"
+
+
+def build_queries(df, variants: Sequence[str], seed: int) -> List[Dict[str, str]]:
+    """One query per row and variant, labelled with the relevant row id."""
+    rng = random.Random(seed)
+    make: Dict[str, Callable[[str], str]] = {
+        "exact": lambda t: t,
+        "noise": lambda t: add_noise(t, rng),
+        "paraphrase": lambda t: paraphrase(t, rng),
+    }
+    return [
+        {"variant": variant, "query": make[variant](title.strip()), "id": doc_id}
+        for doc_id, title in zip(df["id"], df["title"])
+        for variant in variants
+    ]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 and mean in milliseconds plus sequential QPS."""
+    if not samples:
+        return {}
+    ms = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "qps": round(1000 / float(ms.mean()), 1) if ms.mean() else 0.0,
+    }
+
+
+def quality(ranks: List[int], ks: Sequence[int]) -> Dict[str, float]:
+    """Recall@k and MRR from 1-based ranks (0 = not retrieved)."""
+    ranks = np.asarray(ranks)
+    found = ranks > 0
+    result = {
+        f"recall@{k}": round(float(np.mean(found & (ranks <= k))), 4) for k in ks
+    }
+    result["mrr"] = round(float(np.mean(np.where(found, 1 / np.maximum(ranks, 1), 0))), 4)
+    return result
+
+
+def ensure_index(store, artifact: str) -> None:
+    """Populate an empty store from the artifact or the dataset."""
+    if store.list_ids():
+        return
+    from hoax_detect.data.loader import initialize_from_artifact, initialize_vector_db
+
+    if artifact:
+        initialize_from_artifact(artifact)
+    else:
+        initialize_vector_db()
+
+
+STAGES = {
+    "embedding": "embedding",
+    "vector_search": "search",
+    "lexical_search": "lexical",
+    "payload_fetch": "payload",
+}
+
+
+def run(args) -> Dict:
+    from hoax_detect.data.loader import HASH_FIELDS, load_dataset, row_hash
+    from hoax_detect.services.embedding import embed_batch, get_model
+    from hoax_detect.services.lexical import get_lexical_index
+    from hoax_detect.services.metrics import record_spans, span
+    from hoax_detect.services.vector_store import (
+        get_vector_store,
+        search_similar_chunks_batch,
+    )
+
+    store = get_vector_store()
+    if args.nprobe is not None and hasattr(store, "nprobe"):
+        store.nprobe = args.nprobe  # wins over a saved tuning result too
+    ensure_index(store, args.artifact)
+    df = load_dataset()
+    if args.sample and args.sample < len(df):
+        df = df.sample(n=args.sample, random_state=args.seed)
+    queries = build_queries(df, args.variants, args.seed)
+    lexical = get_lexical_index() if settings.HYBRID_SEARCH else None
+
+    get_model()
+    store.warm_up()
+    embed_batch(["warm up"])
+
+    depth = max(args.top_k, max(args.k))
+
+    def search(query: str, embedding: np.ndarray) -> List[str]:
+        chunks = search_similar_chunks_batch(
+            [query], [embedding], top_k=depth, threshold=args.threshold
+        )[0]
+        return [row_hash([getattr(c, f) for f in HASH_FIELDS]) for c in chunks]
+
+    modes = ["vector", "hybrid"] if lexical is not None else ["vector"]
+    ranks: Dict[str, Dict[str, List[int]]] = {mode: {} for mode in modes}
+    timings: Dict[str, List[float]] = {name: [] for name in STAGES.values()}
+    timings["end_to_end"] = []
+    query_embeddings = []
+    for q in queries:
+        with record_spans() as stages:
+            start = time.perf_counter()
+            with span("embedding"):
+                embedding = embed_batch([q["query"]])[0]
+            ids = search(q["query"], embedding)
+            timings["end_to_end"].append(time.perf_counter() - start)
+        for stage, name in STAGES.items():
+            if stage in stages:
+                timings[name].append(stages[stage])
+        query_embeddings.append(embedding)
+        ranked = {modes[-1]: ids}
+        if lexical is not None:
+            settings.HYBRID_SEARCH = False
+            try:
+                ranked["vector"] = search(q["query"], embedding)
+            finally:
+                settings.HYBRID_SEARCH = True
+
+        for mode, ids in ranked.items():
+            rank = ids.index(q["id"]) + 1 if q["id"] in ids else 0
+            ranks[mode].setdefault(q["variant"], []).append(rank)
+
+    report = {
+        "config": {
+            "backend": store.name,
+            "embedding_model": settings.EMBEDDING_MODEL,
+            "hybrid_search": lexical is not None,
+            "top_k": depth,
+            "threshold": args.threshold,
+            "local_ivf_nlist": getattr(store, "nlist", None),
+            "local_ivf_nprobe": getattr(store, "nprobe", None),
+            "documents": len(store.list_ids()),
+            "queries": len(queries),
+            "seed": args.seed,
+        },
+        "quality": {
+            mode: {
+                **{v: quality(r, args.k) for v, r in ranks[mode].items()},
+                "all": quality(
+                    [x for r in ranks[mode].values() for x in r], args.k
+                ),
+            }
+            for mode in modes
+        },
+        "latency": {
+            stage: percentiles(samples)
+            for stage, samples in timings.items()
+            if samples
+        },
+    }
+    if args.classifier:
+        report["classifier"] = classifier_report(df, query_embeddings)
+    return report
+
+
+def classifier_report(df, query_embeddings: List[np.ndarray]) -> Dict:
+    """Claim/debunk separation and latency of the pre-filter classifier.
+
+    The title-derived queries are positives and the rows' ``fact`` texts are
+    negatives. These are the same kinds of text the classifier was trained on
+    (often the same rows), and every row is a hoax, so this measures how well
+    it tells claim wording from rebuttal wording, not hoax detection.
+    """
+    from hoax_detect.services.classifier import (
+        HoaxClassifier,
+        confident_fraction,
+        evaluate,
+    )
+    from hoax_detect.services.embedding import embed_batch
+
+    classifier = HoaxClassifier.load(settings.CLASSIFIER_PATH)
+    embeddings = np.vstack([np.vstack(query_embeddings), embed_batch(df["fact"].tolist())])
+    labels = np.concatenate([np.ones(len(query_embeddings)), np.zeros(len(df))])
+
+    single = []
+    for row in embeddings:
+        start = time.perf_counter()
+        classifier.predict_proba(row)
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    probabilities = classifier.predict_proba(embeddings)
+    batched = time.perf_counter() - start
+
+    return {
+        "path": settings.CLASSIFIER_PATH,
+        "trained_eval": classifier.manifest.get("eval"),
+        "claim_vs_debunk": evaluate(probabilities, labels),
+        "confidence": confident_fraction(
+            probabilities, labels, settings.CLASSIFIER_SKIP_WEB_THRESHOLD
+        ),
+        "latency_single": percentiles(single),
+        "latency_batched_ms_per_query": round(batched / len(embeddings) * 1000, 5),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark retrieval quality and latency")
+    parser.add_argument("--backend", choices=["local", "milvus"], default="local")
+    parser.add_argument("--index-path", help="Local index directory to use or build")
+    parser.add_argument("--artifact", default=settings.EMBEDDING_ARTIFACT_PATH)
+    parser.add_argument("--sample", type=int, default=300, help="Rows to query (0 = all)")
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=VARIANTS)
+    parser.add_argument(
+        "--top-k", type=int, default=5, help="Hits per query (at least max --k)"
+    )
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--nprobe", type=int, help="Override the local IVF nprobe")
+    parser.add_argument("--no-hybrid", action="store_true", help="Vector search only")
+    parser.add_argument(
+        "--classifier",
+        action="store_true",
+        help="Also report accuracy and latency of the CLASSIFIER_PATH classifier",
+    )
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    from hoax_detect.services.vector_store import SIMILARITY_THRESHOLD
+
+    settings.VECTOR_STORE_BACKEND = args.backend
+    if args.index_path:
+        settings.LOCAL_INDEX_PATH = args.index_path
+        settings.LEXICAL_INDEX_PATH = os.path.join(args.index_path, "lexical_index.npz")
+        settings.PAYLOAD_STORE_PATH = os.path.join(args.index_path, "payload_store.npz")
+    if args.no_hybrid:
+        settings.HYBRID_SEARCH = False
+    if args.threshold is None:
+        args.threshold = SIMILARITY_THRESHOLD
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
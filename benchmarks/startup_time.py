@@ -0,0 +1,87 @@
+"""Measure cold import cost of the API, CLI and Gradio entry points.
+
+Each module is imported in a fresh interpreter several times and the median
+wall time is reported, together with the heavy dependencies (torch,
+sentence_transformers, onnxruntime, pymilvus, pandas) that the import pulled
+in. Heavy dependencies should only appear once the first request needs them.
+
+    python -m benchmarks.startup_time --repeat 5 --output startup.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "hoax_detect.cli",
+    "hoax_detect.config",
+    "hoax_detect.services",
+    "hoax_detect.data.loader",
+    "hoax_detect.api",
+]
+HEAVY_MODULES = ["torch", "sentence_transformers", "onnxruntime", "pymilvus", "pandas"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "heavy": sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    """Import ``module`` in ``repeat`` fresh interpreters and summarise."""
+    timings = []
+    heavy = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        heavy = result["heavy"]
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "max_ms": round(max(timings) * 1000, 1),
+        "heavy_imports": heavy,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import/startup time")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        try:
+            results.append(measure(module, args.repeat))
+        except subprocess.CalledProcessError as e:
+            results.append({"module": module, "error": e.stderr.strip()[-500:]})
+
+    for result in results:
+        if "error" in result:
+            print(f"{result['module']:<28} ERROR")
+            continue
+        heavy = ", ".join(result["heavy_imports"]) or "-"
+        print(f"{result['module']:<28} {result['median_ms']:>8.1f} ms  heavy: {heavy}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
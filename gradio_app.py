@@ -1,4 +1,6 @@
 import gradio as gr
+from typing import Iterator
+from hoax_detect.cli import stream_fact_check
 from hoax_detect.config import settings
 from hoax_detect.models import FactCheckRequest
 import requests
@@ -24,6 +26,31 @@ def fact_check_interface(
         return "Error", f"API error: {e}", ""
 
 
+def fact_check_stream_interface(
+    query: str, use_vector_db: bool, use_tavily: bool
+) -> Iterator[tuple[str, str, str]]:
+    """Gradio interface that fills in results as the API streams them."""
+    verdict, explanation, sources = "Checking...", "", ""
+    yield verdict, explanation, sources
+    try:
+        for event, data in stream_fact_check(query, use_vector_db, use_tavily):
+            if event == "context":
+                urls = [source["url"] for source in data["sources"]]
+                titles = [f"[DB] {chunk['title']}" for chunk in data["chunks"]]
+                sources = "\n".join(titles + urls) or "No sources"
+            elif event == "token":
+                explanation += data["text"]
+            elif event == "verdict":
+                verdict = data.get("verdict", "Unknown")
+                explanation = data.get("explanation", explanation)
+                sources = "\n".join(data.get("sources", [])) or sources or "No sources"
+            elif event == "error":
+                verdict, explanation = "Error", f"API error: {data.get('detail')}"
+            yield verdict, explanation, sources
+    except Exception as e:
+        yield "Error", f"API error: {e}", ""
+
+
 with gr.Blocks(title="Hoax News Fact Checker") as demo:
     gr.Markdown("# Hoax News Fact Checking")
     with gr.Row():
@@ -45,7 +72,7 @@ with gr.Blocks(title="Hoax News Fact Checker") as demo:
         sources = gr.Textbox(label="Sources", lines=3, interactive=False)
 
     submit_btn.click(
-        fn=fact_check_interface,
+        fn=fact_check_stream_interface,
         inputs=[query, use_vector_db, use_tavily],
         outputs=[verdict, explanation, sources],
     )
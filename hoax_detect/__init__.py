@@ -7,3 +7,4 @@ __version__ = "1.0.0"
 # Config paths
 CONFIG_DIR = Path(__file__).parent / "config"
 TRUSTED_DOMAINS_PATH = CONFIG_DIR / "trusted_domains.json"
+STOPWORDS_PATH = CONFIG_DIR / "stopwords_id.json"
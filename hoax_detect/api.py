@@ -1,13 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Collection,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+)
+from hoax_detect.config import settings
 from hoax_detect.services import (
+    embed_batch,
     search_similar_chunks,
-    call_tavily_api,
-    call_openrouter,
-    build_prompt,
+    search_similar_chunks_batch,
+    acall_tavily_api,
+    acall_openrouter,
+    astream_openrouter,
+    build_prompt_with_stats,
+    embedding,
+    vector_store,
+)
+from hoax_detect.services.classifier import get_classifier
+from hoax_detect.services.payload_store import get_chunk_cache
+from hoax_detect.services.web_search import get_result_cache
+from hoax_detect.services.cache import (
+    SemanticCache,
+    SQLiteCacheBackend,
+    TTLCache,
+    query_hash,
 )
+from hoax_detect.services.http import aclose_clients
+from hoax_detect.services import metrics
+from hoax_detect.services.metrics import span, track_request
+from hoax_detect.services.prompt import PromptStats
+from hoax_detect.services.rate_limit import TokenBucket
+from hoax_detect.services.singleflight import SingleFlight
 from hoax_detect.models import (
     FactCheckRequest,
     FactCheckResponse,
@@ -15,11 +48,55 @@ from hoax_detect.models import (
     HoaxChunk,
 )
 from pydantic import BaseModel
+import asyncio
+import json
 import logging
+import numpy as np
+import re
 import sys
 
 load_dotenv()
 
+T = TypeVar("T")
+
+# Bounded pool for blocking work (embedding, vector DB) so it never runs on
+# the event loop. Web search and LLM calls use the shared async HTTP client.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.RETRIEVAL_MAX_WORKERS, thread_name_prefix="retrieval"
+)
+_tavily_bucket = TokenBucket(settings.TAVILY_RATE_LIMIT)
+_openrouter_bucket = TokenBucket(settings.OPENROUTER_RATE_LIMIT)
+
+
+def split_rate_limits(workers: int) -> None:
+    """Share the upstream rate limits between ``workers`` server processes."""
+    _tavily_bucket.split(workers)
+    _openrouter_bucket.split(workers)
+
+
+def _cache_backend(table: str) -> Optional[SQLiteCacheBackend]:
+    if not settings.CACHE_DB_PATH:
+        return None
+    return SQLiteCacheBackend(settings.CACHE_DB_PATH, table)
+
+
+# Exact matches on the normalised query text are checked first, then
+# near-duplicates by query embedding.
+_response_cache = TTLCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    ttl=settings.CACHE_TTL,
+    backend=_cache_backend("response_cache"),
+)
+_semantic_cache = SemanticCache(
+    max_distance=settings.SEMANTIC_CACHE_MAX_DISTANCE,
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    ttl=settings.CACHE_TTL,
+    backend=_cache_backend("semantic_cache"),
+)
+# Concurrent identical requests (same normalised query and options) wait on
+# the first one's computation instead of repeating every upstream call.
+_in_flight: SingleFlight[FactCheckResponse] = SingleFlight("fact_check")
+
 app = FastAPI(
     title="Hoax News Fact Checking API",
     description="API for fact checking Indonesian news using RAG with Milvus and Tavily.",
@@ -43,10 +120,33 @@ logging.basicConfig(
 )
 
 
+@app.on_event("startup")
+async def warm_up() -> None:
+    """Load the embedding model and Milvus collection before serving."""
+    if not settings.WARMUP_ON_STARTUP:
+        return
+    for name, hook in (
+        ("embedding model", embedding.warm_up),
+        ("milvus", vector_store.warm_up),
+    ):
+        try:
+            await asyncio.to_thread(hook)
+            logging.info("Warmed up %s", name)
+        except Exception as e:
+            logging.warning("Warm-up of %s failed: %s", name, e)
+
+
+@app.on_event("shutdown")
+async def close_http_clients() -> None:
+    """Close pooled upstream HTTP connections."""
+    await aclose_clients()
+
+
 class BatchFactCheckRequest(BaseModel):
     queries: List[str]
     use_vector_db: bool = True
     use_tavily: bool = True
+    fast_path: bool = True
     verbose: bool = False
 
 
@@ -55,54 +155,557 @@ async def fact_check(
     request: FactCheckRequest, verbose: bool = False
 ) -> FactCheckResponse:
     """Main fact checking endpoint."""
+    with track_request("fact_check"):
+        if not settings.COALESCE_REQUESTS:
+            return await _run_fact_check(request, verbose=verbose)
+        return await _in_flight.do(
+            _flight_key(request), lambda: _run_fact_check(request, verbose=verbose)
+        )
+
+
+def _flight_key(request: FactCheckRequest) -> str:
+    return query_hash(
+        request.query, _cache_namespace(request), f"fast_path={request.fast_path}"
+    )
+
+
+async def _run_fact_check(
+    request: FactCheckRequest,
+    verbose: bool = False,
+    query_embedding: Optional[np.ndarray] = None,
+) -> FactCheckResponse:
+    """Run retrieval, prompting and the LLM call for a single query."""
     try:
-        chunks, web_results = await _retrieve_context(request)
+        if _needs_embedding(request) and query_embedding is None:
+            query_embedding = await _embed_query(request.query)
+
+        cached = _cached_response(request, query_embedding)
+        if cached is not None:
+            return cached
+
+        confident = _classifier_confident(query_embedding)
+        chunks, web_results, failed = await _retrieve_context(
+            request, query_embedding, confident
+        )
+        fast = _try_fast_path(request, query_embedding, chunks)
+        if fast is not None:
+            return fast
+
+        response = await _answer(request.query, chunks, web_results, verbose=verbose)
+        _store_response(request, query_embedding, response, failed)
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.warning("Fact check failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _embed_query(query: str) -> np.ndarray:
+    with span("embedding"):
+        return (await _run_blocking(embed_batch, [query]))[0]
+
+
+@app.post("/fact_check/stream")
+async def fact_check_stream(
+    request: FactCheckRequest, verbose: bool = False
+) -> StreamingResponse:
+    """Fact check with progressive Server-Sent Events.
+
+    Emits a ``context`` event with the retrieved chunks and web sources as
+    soon as retrieval finishes, ``token`` events while the LLM generates,
+    then a ``verdict`` event with the final ``FactCheckResponse`` (or an
+    ``error`` event). A fast-path answer from a stored fact check goes
+    straight from ``context`` to ``verdict``.
+    """
+    return StreamingResponse(
+        _stream_fact_check(request, verbose),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        prompt = build_prompt(request.query, chunks, web_results)
 
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_fact_check(
+    request: FactCheckRequest, verbose: bool = False
+) -> AsyncIterator[str]:
+    with metrics.REQUESTS_IN_FLIGHT.track(endpoint="fact_check_stream"):
+        async for event in _stream_events(request, verbose):
+            yield event
+
+
+async def _stream_events(
+    request: FactCheckRequest, verbose: bool = False
+) -> AsyncIterator[str]:
+    try:
+        query_embedding = None
+        if _needs_embedding(request):
+            query_embedding = await _embed_query(request.query)
+
+        cached = _cached_response(request, query_embedding)
+        if cached is not None:
+            yield _sse("verdict", cached.model_dump())
+            return
+
+        confident = _classifier_confident(query_embedding)
+        chunks, web_results, failed = await _retrieve_context(
+            request, query_embedding, confident
+        )
+        yield _sse(
+            "context",
+            {
+                "chunks": [
+                    chunk.model_dump(exclude={"embedding"}) for chunk in chunks
+                ],
+                "sources": [res.model_dump() for res in web_results],
+            },
+        )
+
+        fast = _try_fast_path(request, query_embedding, chunks)
+        if fast is not None:
+            yield _sse("verdict", fast.model_dump())
+            return
+
+        with span("prompt_build"):
+            prompt, prompt_stats = build_prompt_with_stats(
+                request.query, chunks, web_results
+            )
         if verbose:
-            logging.info("\n=== LLM PROMPT ===\n%s\n=== END PROMPT ===", prompt)
+            _log_prompt(prompt, prompt_stats)
 
-        llm_response = call_openrouter(prompt)
+        await _openrouter_bucket.acquire()
+        tokens = []
+        with span("llm_stream"):
+            async for token in astream_openrouter(prompt):
+                tokens.append(token)
+                yield _sse("token", {"text": token})
 
+        llm_response = "".join(tokens)
         if not llm_response:
-            raise HTTPException(status_code=500, detail="LLM service error")
+            raise RuntimeError("LLM service error")
 
-        response = _format_response(llm_response, web_results)
-        return response
+        with span("verdict_parse"):
+            response = _format_response(llm_response, web_results)
+        _store_response(request, query_embedding, response, failed)
+        yield _sse("verdict", response.model_dump())
 
     except Exception as e:
-        print(str(e))
-        raise HTTPException(status_code=500, detail=str(e))
+        metrics.REQUEST_ERRORS.inc(endpoint="fact_check_stream")
+        logging.warning("Streaming fact check failed: %s", e)
+        yield _sse("error", {"detail": str(e)})
+
+
+async def _answer(
+    query: str,
+    chunks: List[HoaxChunk],
+    web_results: List[NewsResult],
+    verbose: bool = False,
+) -> FactCheckResponse:
+    """Build the prompt from retrieved context and ask the LLM for a verdict."""
+    with span("prompt_build"):
+        prompt, prompt_stats = build_prompt_with_stats(query, chunks, web_results)
+
+    if verbose:
+        _log_prompt(prompt, prompt_stats)
+
+    await _openrouter_bucket.acquire()
+    with span("llm"):
+        llm_response = await acall_openrouter(prompt)
+
+    if not llm_response:
+        raise HTTPException(status_code=500, detail="LLM service error")
+
+    with span("verdict_parse"):
+        return _format_response(llm_response, web_results)
+
+
+def _log_prompt(prompt: str, stats: PromptStats) -> None:
+    logging.info("\n=== LLM PROMPT ===\n%s\n=== END PROMPT ===", prompt)
+    logging.info(
+        "Prompt size: ~%d tokens (%d chars), %d/%d database results, "
+        "%d/%d web results",
+        stats.tokens,
+        stats.chars,
+        stats.chunks_used,
+        stats.chunks_used + stats.chunks_dropped,
+        stats.web_used,
+        stats.web_used + stats.web_dropped,
+    )
 
 
 @app.post("/batch_fact_check", response_model=List[FactCheckResponse])
 async def batch_fact_check(request: BatchFactCheckRequest) -> List[FactCheckResponse]:
-    """Batch process multiple fact checks."""
-    results = []
-    for query in request.queries:
+    """Batch process multiple fact checks.
+
+    All queries are embedded in one batch and searched with one multi-vector
+    call. Web search and LLM calls then run with at most ``BATCH_CONCURRENCY``
+    queries in flight. Results keep the input order and a failing query
+    yields an ``ERROR`` item instead of failing the batch.
+    """
+    with track_request("batch_fact_check"):
+        return await _run_batch(request)
+
+
+async def _run_batch(request: BatchFactCheckRequest) -> List[FactCheckResponse]:
+    queries = request.queries
+    embeddings: List[Optional[np.ndarray]] = [None] * len(queries)
+    chunks_per_query: List[List[HoaxChunk]] = [[] for _ in queries]
+    probabilities: List[Optional[float]] = [None] * len(queries)
+    vector_failed: Set[str] = set()
+    try:
+        classifier = get_classifier()
+        if (request.use_vector_db or classifier is not None) and queries:
+            with span("embedding"):
+                embeddings = await _run_blocking(embed_batch, queries)
+        if classifier is not None and queries:
+            with span("classifier"):
+                probabilities = classifier.predict_proba(
+                    np.asarray(embeddings)
+                ).tolist()
+    except Exception as e:
+        logging.warning("Batch embedding failed: %s", e)
+        return [_error_response(e) for _ in queries]
+    if request.use_vector_db and queries:
+        chunks_per_query = await _with_deadline(
+            "vector_db",
+            settings.VECTOR_DB_TIMEOUT,
+            _run_blocking(search_similar_chunks_batch, queries, embeddings),
+            default=chunks_per_query,
+            failed=vector_failed,
+        )
+
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def run_one(
+        query: str,
+        embedding: Optional[np.ndarray],
+        chunks: List[HoaxChunk],
+        probability: Optional[float],
+    ) -> FactCheckResponse:
         single_request = FactCheckRequest(
             query=query,
             use_vector_db=request.use_vector_db,
             use_tavily=request.use_tavily,
+            fast_path=request.fast_path,
+        )
+        try:
+            cached = _cached_response(single_request, embedding)
+            if cached is not None:
+                return cached
+            fast = _try_fast_path(single_request, embedding, chunks)
+            if fast is not None:
+                return fast
+
+            confident = _classifier_confident(embedding, probability)
+            failed = set(vector_failed)
+            async with semaphore:
+                web_results: List[NewsResult] = []
+                if request.use_tavily and not _skip_web(
+                    single_request, confident, chunks
+                ):
+                    web_results = await _search_web(query, failed)
+                response = await _answer(
+                    query, chunks, web_results, verbose=request.verbose
+                )
+            _store_response(single_request, embedding, response, failed)
+            return response
+        except Exception as e:
+            logging.warning("Batch item failed for %r: %s", query, e)
+            return _error_response(e)
+
+    return await asyncio.gather(
+        *(
+            run_one(query, embedding, chunks, probability)
+            for query, embedding, chunks, probability in zip(
+                queries, embeddings, chunks_per_query, probabilities
+            )
+        )
+    )
+
+
+def _error_response(error: Exception) -> FactCheckResponse:
+    """The ``ERROR`` item a batch returns for a query that failed."""
+    return FactCheckResponse(
+        verdict="ERROR",
+        explanation="",
+        error=getattr(error, "detail", None) or str(error),
+    )
+
+
+def _cache_namespace(request: FactCheckRequest) -> str:
+    return f"vector_db={request.use_vector_db},tavily={request.use_tavily}"
+
+
+def _cached_response(
+    request: FactCheckRequest, query_embedding: Optional[np.ndarray]
+) -> Optional[FactCheckResponse]:
+    """Look up the exact-match cache, then the semantic cache."""
+    if not settings.CACHE_ENABLED:
+        return None
+    namespace = _cache_namespace(request)
+    exact_key = query_hash(request.query, namespace)
+    cached = _response_cache.get(exact_key)
+    if cached is None and query_embedding is not None:
+        cached = _semantic_cache.get(query_embedding, namespace)
+        if cached is not None:
+            _response_cache.set(exact_key, cached)
+    return FactCheckResponse(**cached) if cached is not None else None
+
+
+def _store_response(
+    request: FactCheckRequest,
+    query_embedding: Optional[np.ndarray],
+    response: FactCheckResponse,
+    failed: Collection[str] = (),
+) -> None:
+    """Cache an answer, unless a requested context source failed.
+
+    An answer built without the vector DB or web results it asked for would
+    otherwise be served for the whole ``CACHE_TTL`` after the source recovers.
+    """
+    if not settings.CACHE_ENABLED:
+        return
+    if failed:
+        logging.info(
+            "Not caching the answer for %r: %s failed",
+            request.query,
+            ", ".join(sorted(failed)),
         )
-        results.append(await fact_check(single_request, verbose=request.verbose))
-    return results
+        return
+    namespace = _cache_namespace(request)
+    value = response.model_dump()
+    _response_cache.set(query_hash(request.query, namespace), value)
+    if query_embedding is not None:
+        _semantic_cache.set(query_embedding, value, namespace)
 
 
 async def _retrieve_context(
     request: FactCheckRequest,
-) -> tuple[List[HoaxChunk], List[NewsResult]]:
-    """Retrieve both vector DB chunks and web search results."""
-    chunks: List[HoaxChunk] = []
+    query_embedding: Optional[np.ndarray] = None,
+    confident: Optional[bool] = None,
+) -> tuple[List[HoaxChunk], List[NewsResult], Set[str]]:
+    """Retrieve vector DB chunks and web search results concurrently.
+
+    Each source has its own deadline; a source that times out or fails
+    contributes no context instead of failing the request, and its name is
+    returned in the set of failed sources. The web search is cancelled when
+    the vector search returns a fast-path match, or a close match while the
+    classifier is ``confident`` (see ``_skip_web``).
+    """
+    failed: Set[str] = set()
     if request.use_vector_db:
-        chunks = search_similar_chunks(request.query)
+        vector = asyncio.ensure_future(
+            _with_deadline(
+                "vector_db",
+                settings.VECTOR_DB_TIMEOUT,
+                _run_blocking(
+                    search_similar_chunks,
+                    request.query,
+                    query_embedding=query_embedding,
+                ),
+                failed=failed,
+            )
+        )
+    else:
+        vector = asyncio.ensure_future(_empty())
 
-    web_results: List[NewsResult] = []
     if request.use_tavily:
-        web_results = call_tavily_api(request.query)
+        web = asyncio.ensure_future(_search_web(request.query, failed))
+    else:
+        web = asyncio.ensure_future(_empty())
+
+    try:
+        chunks = await vector
+        if _fast_path_match(request, chunks) is not None or _skip_web(
+            request, confident, chunks
+        ):
+            return chunks, [], failed
+        return chunks, await web, failed
+    finally:
+        vector.cancel()
+        web.cancel()
+
+
+def _needs_embedding(request: FactCheckRequest) -> bool:
+    return request.use_vector_db or get_classifier() is not None
+
+
+def _classifier_confident(
+    query_embedding: Optional[np.ndarray], probability: Optional[float] = None
+) -> Optional[bool]:
+    """Whether the classifier is at least ``CLASSIFIER_SKIP_WEB_THRESHOLD`` sure.
+
+    None when the classifier is disabled or there is no embedding.
+    """
+    classifier = get_classifier()
+    if classifier is None or query_embedding is None:
+        return None
+    if probability is None:
+        with span("classifier"):
+            probability = float(classifier.predict_proba(query_embedding)[0])
+    return max(probability, 1 - probability) >= settings.CLASSIFIER_SKIP_WEB_THRESHOLD
 
-    return chunks, web_results
+
+def _skip_web(
+    request: FactCheckRequest, confident: Optional[bool], chunks: List[HoaxChunk]
+) -> bool:
+    """Skip web search for a confident classifier and a close stored fact check.
+
+    The classifier is trained on claim versus debunk wording, so its
+    confidence alone says nothing about whether web context is needed; it
+    only counts when a database hit is also at least ``FAST_PATH_THRESHOLD``
+    similar to the query. The classifier never answers on its own.
+    """
+    if confident is None or not request.use_tavily:
+        return False
+    best = max((c.score for c in chunks if c.score is not None), default=None)
+    skip = confident and best is not None and best >= settings.FAST_PATH_THRESHOLD
+    metrics.CLASSIFIER_DECISIONS.inc(result="skip_web" if skip else "passed")
+    return skip
+
+
+# Dataset ``status`` labels that map directly onto a verdict.
+HOAX_STATUSES = {"salah", "hoaks", "hoax", "disinformasi", "misinformasi", "penipuan"}
+FACT_STATUSES = {"benar", "fakta"}
+
+# Strong references to fire-and-forget enrichment tasks.
+_background_tasks: Set["asyncio.Task"] = set()
+
+
+def _status_verdict(status: Optional[str]) -> Optional[str]:
+    status = (status or "").strip().lower()
+    if status in HOAX_STATUSES:
+        return "HOAX"
+    if status in FACT_STATUSES:
+        return "FACT"
+    return None
+
+
+def _fast_path_match(
+    request: FactCheckRequest, chunks: List[HoaxChunk]
+) -> Optional[HoaxChunk]:
+    """The top chunk if it is similar enough to answer without the LLM."""
+    if not (settings.FAST_PATH_ENABLED and request.fast_path):
+        return None
+    scored = [chunk for chunk in chunks if chunk.score is not None]
+    if not scored:
+        return None
+    best = max(scored, key=lambda chunk: chunk.score)
+    if best.score < settings.FAST_PATH_THRESHOLD or not _status_verdict(best.status):
+        return None
+    return best
+
+
+def _try_fast_path(
+    request: FactCheckRequest,
+    query_embedding: Optional[np.ndarray],
+    chunks: List[HoaxChunk],
+) -> Optional[FactCheckResponse]:
+    """Answer from a stored fact check when the top hit is a near match.
+
+    With ``FAST_PATH_ENRICH`` the full pipeline still runs in the background
+    and its answer is cached for later requests.
+    """
+    if not (settings.FAST_PATH_ENABLED and request.fast_path and request.use_vector_db):
+        return None
+    match = _fast_path_match(request, chunks)
+    if match is None:
+        metrics.FAST_PATH.inc(result="miss")
+        return None
+
+    metrics.FAST_PATH.inc(result="hit")
+    if settings.FAST_PATH_ENRICH and settings.CACHE_ENABLED:
+        task = asyncio.create_task(_enrich(request, query_embedding, chunks))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    return _stored_verdict(match)
+
+
+def _stored_verdict(chunk: HoaxChunk) -> FactCheckResponse:
+    """Build a response from a stored fact check."""
+    verdict = _status_verdict(chunk.status)
+    explanation = "\n\n".join(
+        [
+            f"Verdict: {verdict}",
+            f"Klaim ini cocok dengan cek fakta \"{chunk.title.strip()}\" "
+            f"(status: {chunk.status}, kemiripan {chunk.score:.2f}).",
+            f"Kesimpulan: {chunk.conclusion.strip()}",
+            f"Fakta: {chunk.fact.strip()}",
+        ]
+    )
+    return FactCheckResponse(
+        verdict=verdict,
+        explanation=explanation,
+        sources=re.findall(r"https?://\S+", chunk.references or ""),
+        source="database",
+    )
+
+
+async def _enrich(
+    request: FactCheckRequest,
+    query_embedding: Optional[np.ndarray],
+    chunks: List[HoaxChunk],
+) -> None:
+    """Run web search and the LLM for a fast-path answer and cache the result."""
+    try:
+        failed: Set[str] = set()
+        web_results = (
+            await _search_web(request.query, failed) if request.use_tavily else []
+        )
+        response = await _answer(request.query, chunks, web_results)
+        _store_response(request, query_embedding, response, failed)
+    except Exception as e:
+        logging.warning("Background enrichment failed for %r: %s", request.query, e)
+
+
+async def _search_web(
+    query: str, failed: Optional[Set[str]] = None
+) -> List[NewsResult]:
+    """Rate-limited Tavily search under its own deadline."""
+    await _tavily_bucket.acquire()
+    with span("tavily"):
+        return await _with_deadline(
+            "tavily", settings.TAVILY_TIMEOUT, acall_tavily_api(query), failed=failed
+        )
+
+
+async def _run_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking call on the shared thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: fn(*args, **kwargs))
+
+
+async def _with_deadline(
+    name: str,
+    timeout: float,
+    source: Awaitable[T],
+    default: Optional[T] = None,
+    failed: Optional[Set[str]] = None,
+) -> T:
+    """Await a retrieval source with a deadline.
+
+    Returns ``default`` (an empty list unless given) on timeout or error,
+    and adds ``name`` to ``failed`` when given.
+    """
+    try:
+        return await asyncio.wait_for(source, timeout)
+    except asyncio.TimeoutError:
+        metrics.SOURCE_FAILURES.inc(source=name, reason="timeout")
+        logging.warning("%s timed out after %.1fs, continuing without it", name, timeout)
+    except Exception as e:
+        metrics.SOURCE_FAILURES.inc(source=name, reason="error")
+        logging.warning("%s failed, continuing without it: %s", name, e)
+    if failed is not None:
+        failed.add(name)
+    return [] if default is None else default
+
+
+async def _empty() -> List:
+    return []
 
 
 def _format_response(
@@ -123,11 +726,84 @@ def _format_response(
     )
 
 
+def _record_cache_metrics() -> None:
+    metrics.record_cache_stats("exact", _response_cache.stats())
+    metrics.record_cache_stats("semantic", _semantic_cache.stats())
+    metrics.record_cache_stats("tavily", get_result_cache().stats())
+    metrics.record_cache_stats("payload", get_chunk_cache().stats())
+    metrics.COALESCE_IN_FLIGHT.set(len(_in_flight), endpoint=_in_flight.name)
+
+
+metrics.add_collector(_record_cache_metrics)
+
+
+@app.get("/cache_stats")
+async def cache_stats():
+    """Hit/miss counters for the caches, plus coalesced in-flight requests.
+
+    Under several workers the counters are summed over all of them.
+    """
+    if metrics.multiprocess_enabled():
+        merged = await asyncio.to_thread(metrics.merged_values)
+        stats = metrics.cache_stats(merged)
+        key = (_in_flight.name,)
+        stats["in_flight"] = {
+            "in_flight": int(merged[metrics.COALESCE_IN_FLIGHT.name].get(key, 0)),
+            "coalesced": int(merged[metrics.COALESCED_REQUESTS.name].get(key, 0)),
+        }
+        return stats
+    return {
+        "exact": _response_cache.stats(),
+        "semantic": _semantic_cache.stats(),
+        "tavily": get_result_cache().stats(),
+        "payload": get_chunk_cache().stats(),
+        "in_flight": _in_flight.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """Stage latencies, request and cache counters in Prometheus format."""
+    return PlainTextResponse(
+        await asyncio.to_thread(metrics.render),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "services": ["milvus_vector_db", "tavily_web_search", "openrouter_llm"],
-        "version": "1.0.0",
+    """Probe the vector store and embedding model.
+
+    Returns 503 when the vector store cannot be reached or the model failed
+    to load. With ``WARMUP_ON_STARTUP`` disabled an unloaded model is
+    reported but does not make the service unhealthy.
+    """
+    checks = {}
+    healthy = True
+
+    try:
+        store = vector_store.get_vector_store()
+        details = await asyncio.wait_for(
+            asyncio.to_thread(store.health), settings.VECTOR_DB_TIMEOUT
+        )
+        checks["vector_store"] = {"status": "ok", "backend": store.name, **details}
+    except Exception as e:
+        healthy = False
+        checks["vector_store"] = {"status": "error", "detail": str(e) or repr(e)}
+
+    loaded = embedding.is_model_loaded()
+    checks["embedding_model"] = {
+        "status": "ok" if loaded or not settings.WARMUP_ON_STARTUP else "error",
+        "model": settings.EMBEDDING_MODEL,
+        "loaded": loaded,
     }
+    healthy = healthy and checks["embedding_model"]["status"] == "ok"
+
+    return JSONResponse(
+        {
+            "status": "healthy" if healthy else "unhealthy",
+            "checks": checks,
+            "version": "1.0.0",
+        },
+        status_code=200 if healthy else 503,
+    )
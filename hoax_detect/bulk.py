@@ -0,0 +1,255 @@
+"""Bulk fact checking from a JSONL or CSV file.
+
+The input is streamed line by line and at most ``concurrency`` requests are
+in flight, either against the API over one pooled HTTP client or in-process
+through the FastAPI handlers without HTTP. Each result is appended to the
+JSONL output as soon as it completes, so an interrupted run can be resumed:
+ids that already have a result in the output file are skipped and ids that
+failed are retried.
+
+    python -m hoax_detect.cli --input claims.jsonl --output results.jsonl --concurrency 16
+"""
+import asyncio
+import csv
+import json
+import os
+import statistics
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Iterator, Set, Tuple
+from hoax_detect.config import settings
+from hoax_detect.models import FactCheckRequest, FactCheckResponse
+
+RETRY_STATUSES = {429, 502, 503, 504}
+QUERY_FIELDS = ("query", "claim", "title", "text")
+
+Checker = Callable[[FactCheckRequest], Awaitable[FactCheckResponse]]
+
+
+class BulkStats:
+    """Counters and per-item latencies for one bulk run."""
+
+    def __init__(self):
+        self.read = 0
+        self.skipped = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.errors: Counter = Counter()
+        self.verdicts: Counter = Counter()
+        self.latencies = []
+        self.started = time.perf_counter()
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        done = self.succeeded + self.failed
+        latencies = sorted(self.latencies)
+        return {
+            "read": self.read,
+            "skipped_existing": self.skipped,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 2),
+            "throughput_per_second": round(done / elapsed, 2) if elapsed else 0.0,
+            "latency_p50_seconds": round(statistics.median(latencies), 3)
+            if latencies
+            else None,
+            "latency_p95_seconds": round(latencies[int(0.95 * (len(latencies) - 1))], 3)
+            if latencies
+            else None,
+            "verdicts": dict(self.verdicts),
+            "errors": dict(self.errors),
+        }
+
+
+def read_records(path: str) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """Yield ``(id, query, record)`` from a JSONL or CSV file, one at a time.
+
+    The id is the record's ``id`` field, or its 1-based line/row number.
+    Plain-text lines and JSON strings or numbers in a ``.jsonl``/``.txt`` file
+    are taken as the query; other JSON values that are not objects have none.
+    """
+    is_csv = path.lower().endswith(".csv")
+    with open(path, "r", encoding="utf-8", newline="" if is_csv else None) as f:
+        rows = csv.DictReader(f) if is_csv else f
+        for number, row in enumerate(rows, 1):
+            if not is_csv:
+                row = row.strip()
+                if not row:
+                    continue
+                try:
+                    row = json.loads(row)
+                except ValueError:
+                    row = {"query": row}
+                if isinstance(row, (str, int, float)) and not isinstance(row, bool):
+                    row = {"query": str(row)}
+                elif not isinstance(row, dict):
+                    row = {}  # null, a list, ...: reported as a missing query
+            query = next((row[k] for k in QUERY_FIELDS if row.get(k)), None)
+            yield str(row.get("id") or number), query, row
+
+
+def completed_ids(path: str) -> Set[str]:
+    """Ids that already have a successful result in an existing output file."""
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crash
+            if "result" in entry:
+                done.add(str(entry["id"]))
+            else:
+                done.discard(str(entry.get("id")))
+    return done
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def http_checker(
+    url: str, concurrency: int, timeout: float, retries: int
+) -> Tuple[Checker, Callable[[], Awaitable[None]]]:
+    """Checker posting to the API over one pooled keep-alive client."""
+    import httpx
+
+    client = httpx.AsyncClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=concurrency, max_keepalive_connections=concurrency
+        ),
+    )
+
+    async def check(request: FactCheckRequest) -> FactCheckResponse:
+        for attempt in range(retries + 1):
+            try:
+                response = await client.post(url, json=request.model_dump())
+            except httpx.TransportError:
+                if attempt == retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    response.raise_for_status()
+                    return FactCheckResponse(**response.json())
+            await asyncio.sleep(min(2**attempt, 10))
+        raise AssertionError("unreachable")
+
+    return check, client.aclose
+
+
+async def in_process_checker() -> Tuple[Checker, Callable[[], Awaitable[None]]]:
+    """Checker calling the API handler directly, without HTTP."""
+    from hoax_detect import api
+
+    await api.warm_up()
+
+    async def check(request: FactCheckRequest) -> FactCheckResponse:
+        return await api.fact_check(request)
+
+    return check, api.close_http_clients
+
+
+def _error_name(error: Exception) -> str:
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    status = status or getattr(error, "status_code", None)
+    return f"HTTP {status}" if status else type(error).__name__
+
+
+async def run_bulk(
+    input_path: str,
+    output_path: str,
+    concurrency: int = 8,
+    in_process: bool = False,
+    use_vector_db: bool = True,
+    use_tavily: bool = True,
+    timeout: float = 120,
+    retries: int = 2,
+    progress_every: int = 100,
+) -> Dict[str, Any]:
+    """Fact check every record of ``input_path`` into ``output_path``."""
+    stats = BulkStats()
+    done = completed_ids(output_path)
+    if in_process:
+        check, close = await in_process_checker()
+    else:
+        check, close = http_checker(
+            settings.FACTCHECK_API_URL, concurrency, timeout, retries
+        )
+
+    async def run_one(record_id: str, query: str, out) -> None:
+        start = time.perf_counter()
+        entry: Dict[str, Any] = {"id": record_id, "query": query}
+        try:
+            result = await check(
+                FactCheckRequest(
+                    query=query, use_vector_db=use_vector_db, use_tavily=use_tavily
+                )
+            )
+            entry["result"] = result.model_dump()
+            stats.succeeded += 1
+            stats.verdicts[result.verdict] += 1
+        except Exception as e:
+            entry["error"] = getattr(e, "detail", None) or str(e) or repr(e)
+            stats.failed += 1
+            stats.errors[_error_name(e)] += 1
+        stats.latencies.append(time.perf_counter() - start)
+        entry["seconds"] = round(stats.latencies[-1], 3)
+        out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        out.flush()
+        finished = stats.succeeded + stats.failed
+        if progress_every and finished % progress_every == 0:
+            print(
+                f"{finished} done ({stats.failed} failed), "
+                f"{finished / (time.perf_counter() - stats.started):.1f}/s",
+                flush=True,
+            )
+
+    pending: Set[asyncio.Task] = set()
+    try:
+        with open(output_path, "a", encoding="utf-8") as out:
+            if out.tell() and not _ends_with_newline(output_path):
+                out.write("\n")  # terminate a line cut short by a crash
+            for record_id, query, _ in read_records(input_path):
+                stats.read += 1
+                if record_id in done:
+                    stats.skipped += 1
+                    continue
+                if not query:
+                    stats.failed += 1
+                    stats.errors["missing query"] += 1
+                    continue
+                # Bound in-flight work (and memory) regardless of file size.
+                if len(pending) >= concurrency:
+                    _, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                pending.add(asyncio.create_task(run_one(record_id, query, out)))
+            if pending:
+                await asyncio.wait(pending)
+    finally:
+        for task in pending:
+            task.cancel()
+        await close()
+    return stats.summary()
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    print("\n=== Bulk Fact Check Summary ===")
+    print(
+        f"Read {summary['read']} records: {summary['succeeded']} succeeded, "
+        f"{summary['failed']} failed, {summary['skipped_existing']} already done"
+    )
+    print(
+        f"Elapsed {summary['elapsed_seconds']}s, "
+        f"{summary['throughput_per_second']} checks/s, "
+        f"p50 {summary['latency_p50_seconds']}s, p95 {summary['latency_p95_seconds']}s"
+    )
+    if summary["verdicts"]:
+        print("Verdicts: " + ", ".join(f"{k}={v}" for k, v in summary["verdicts"].items()))
+    if summary["errors"]:
+        print("Errors: " + ", ".join(f"{k}={v}" for k, v in summary["errors"].items()))
@@ -1,6 +1,7 @@
 import argparse
+import json
 import requests
-from typing import Optional
+from typing import Any, Iterator, Optional, Tuple
 from hoax_detect.config import settings
 from hoax_detect.models import FactCheckRequest, FactCheckResponse
 
@@ -24,17 +25,129 @@ def fact_check(
         return None
 
 
+def stream_fact_check(
+    query: str, use_vector_db: bool = True, use_tavily: bool = True
+) -> Iterator[Tuple[str, Any]]:
+    """Call the streaming endpoint and yield ``(event, data)`` pairs."""
+    with requests.post(
+        settings.FACTCHECK_STREAM_API_URL,
+        json=FactCheckRequest(
+            query=query, use_vector_db=use_vector_db, use_tavily=use_tavily
+        ).model_dump(),
+        stream=True,
+        timeout=120,
+    ) as response:
+        response.raise_for_status()
+        event = "message"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                event = "message"
+            elif line.startswith("event:"):
+                event = line[len("event:") :].strip()
+            elif line.startswith("data:"):
+                yield event, json.loads(line[len("data:") :].strip())
+
+
+def print_result(result: FactCheckResponse) -> None:
+    print("\n=== Fact Check Result ===")
+    print(f"Verdict: {result.verdict}")
+    print(f"\nExplanation:\n{result.explanation}")
+    if result.sources:
+        print("\nSources:")
+        for source in result.sources:
+            print(f"- {source}")
+
+
+def print_stream(query: str, use_vector_db: bool, use_tavily: bool) -> bool:
+    """Render streamed events as they arrive; returns False on failure."""
+    streamed_tokens = False
+    try:
+        for event, data in stream_fact_check(query, use_vector_db, use_tavily):
+            if event == "context":
+                print(f"\nRetrieved {len(data['chunks'])} database matches")
+                for chunk in data["chunks"]:
+                    print(f"- {chunk['title']}")
+                if data["sources"]:
+                    print("\nWeb sources:")
+                    for source in data["sources"]:
+                        print(f"- {source['url']}")
+                print("\n=== Explanation (streaming) ===")
+            elif event == "token":
+                streamed_tokens = True
+                print(data["text"], end="", flush=True)
+            elif event == "verdict":
+                result = FactCheckResponse(**data)
+                if streamed_tokens:
+                    print(f"\n\nVerdict: {result.verdict}")
+                else:
+                    print_result(result)
+                return True
+            elif event == "error":
+                print(f"\nAPI error: {data.get('detail')}")
+                return False
+    except Exception as e:
+        print(f"API error: {e}")
+    return False
+
+
 def main():
     parser = argparse.ArgumentParser(description="Hoax News Fact Checking CLI")
-    parser.add_argument("query", help="News title or content to check")
+    parser.add_argument("query", nargs="?", help="News title or content to check")
     parser.add_argument(
         "--no-vector-db", action="store_true", help="Skip vector database search"
     )
     parser.add_argument(
         "--no-tavily", action="store_true", help="Skip Tavily web search"
     )
+    parser.add_argument(
+        "--stream", action="store_true", help="Show results progressively as they arrive"
+    )
+    bulk = parser.add_argument_group("bulk mode")
+    bulk.add_argument(
+        "--input", help="JSONL or CSV file of queries to check instead of QUERY"
+    )
+    bulk.add_argument(
+        "--output",
+        default="results.jsonl",
+        help="JSONL file results are appended to; completed ids are skipped on rerun",
+    )
+    bulk.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.BATCH_CONCURRENCY,
+        help="Maximum requests in flight",
+    )
+    bulk.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run the pipeline in this process instead of calling the API",
+    )
     args = parser.parse_args()
 
+    if args.input:
+        import asyncio
+        from hoax_detect.bulk import print_summary, run_bulk
+
+        summary = asyncio.run(
+            run_bulk(
+                args.input,
+                args.output,
+                concurrency=max(1, args.concurrency),
+                in_process=args.in_process,
+                use_vector_db=not args.no_vector_db,
+                use_tavily=not args.no_tavily,
+            )
+        )
+        print_summary(summary)
+        return
+    if not args.query:
+        parser.error("a query or --input is required")
+
+    if args.stream:
+        if not print_stream(args.query, not args.no_vector_db, not args.no_tavily):
+            print("Failed to get fact check result")
+        return
+
     result = fact_check(
         query=args.query,
         use_vector_db=not args.no_vector_db,
@@ -42,13 +155,7 @@ def main():
     )
 
     if result:
-        print("\n=== Fact Check Result ===")
-        print(f"Verdict: {result.verdict}")
-        print(f"\nExplanation:\n{result.explanation}")
-        if result.sources:
-            print("\nSources:")
-            for source in result.sources:
-                print(f"- {source}")
+        print_result(result)
     else:
         print("Failed to get fact check result")
 
@@ -5,19 +5,112 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATASET_PATH: str = os.getenv("DATASET_PATH", "hoax_1k.csv")
-    COLUMNS: List[str] = ["title", "content", "fact", "conclusion", "references"]
+    COLUMNS: List[str] = [
+        "title",
+        "content",
+        "fact",
+        "conclusion",
+        "references",
+        "status",
+    ]
     OPENROUTER_API_KEY: str = os.getenv("OPENROUTER_API_KEY")
     TAVILY_API_KEY: str = os.getenv("TAVILY_API_KEY")
+    OPENROUTER_BASE_URL: str = os.getenv(
+        "OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"
+    )
+    TAVILY_BASE_URL: str = os.getenv("TAVILY_BASE_URL", "https://api.tavily.com")
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "32"))
+    HTTP_MAX_RETRIES: int = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+    HTTP_BACKOFF_BASE: float = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+    HTTP_BACKOFF_MAX: float = float(os.getenv("HTTP_BACKOFF_MAX", "8"))
+    HTTP_HEDGE_ENABLED: bool = (
+        os.getenv("HTTP_HEDGE_ENABLED", "false").lower() == "true"
+    )
     MILVUS_HOST: str = os.getenv("MILVUS_HOST", "localhost")
     MILVUS_PORT: str = os.getenv("MILVUS_PORT", "19530")
     MILVUS_TOKEN: str = os.getenv("MILVUS_TOKEN", "")
     MILVUS_COLLECTION: str = os.getenv("MILVUS_COLLECTION", "hoax_embeddings")
+    MILVUS_INDEX_TYPE: str = os.getenv("MILVUS_INDEX_TYPE", "FLAT")
+    MILVUS_INDEX_PARAMS: str = os.getenv("MILVUS_INDEX_PARAMS", "")
+    MILVUS_SEARCH_PARAMS: str = os.getenv("MILVUS_SEARCH_PARAMS", "")
+    INDEX_TUNING_PATH: str = os.getenv("INDEX_TUNING_PATH", "index_tuning.json")
+    VECTOR_STORE_BACKEND: str = os.getenv("VECTOR_STORE_BACKEND", "milvus")
+    LOCAL_INDEX_PATH: str = os.getenv("LOCAL_INDEX_PATH", "local_index")
+    LOCAL_IVF_NLIST: int = int(os.getenv("LOCAL_IVF_NLIST", "0"))
+    LOCAL_IVF_NPROBE: int = int(os.getenv("LOCAL_IVF_NPROBE", "8"))
+    HYBRID_SEARCH: bool = os.getenv("HYBRID_SEARCH", "true").lower() == "true"
+    LEXICAL_INDEX_PATH: str = os.getenv("LEXICAL_INDEX_PATH", "lexical_index.npz")
+    PAYLOAD_STORE_PATH: str = os.getenv("PAYLOAD_STORE_PATH", "payload_store.npz")
+    PAYLOAD_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("PAYLOAD_CACHE_MAX_ENTRIES", "4096")
+    )
+    RRF_K: int = int(os.getenv("RRF_K", "60"))
+    LEXICAL_MIN_SCORE: float = float(os.getenv("LEXICAL_MIN_SCORE", "0.5"))
+    FAST_PATH_ENABLED: bool = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+    FAST_PATH_THRESHOLD: float = float(os.getenv("FAST_PATH_THRESHOLD", "0.9"))
+    FAST_PATH_ENRICH: bool = os.getenv("FAST_PATH_ENRICH", "false").lower() == "true"
+    CLASSIFIER_ENABLED: bool = os.getenv("CLASSIFIER_ENABLED", "false").lower() == "true"
+    CLASSIFIER_PATH: str = os.getenv("CLASSIFIER_PATH", "hoax_classifier.npz")
+    CLASSIFIER_SKIP_WEB_THRESHOLD: float = float(
+        os.getenv("CLASSIFIER_SKIP_WEB_THRESHOLD", "0.95")
+    )
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))
+    PROMPT_FIELD_TOKENS: int = int(os.getenv("PROMPT_FIELD_TOKENS", "120"))
+    INGEST_CHUNK_SIZE: int = int(os.getenv("INGEST_CHUNK_SIZE", "256"))
+    INGEST_QUEUE_SIZE: int = int(os.getenv("INGEST_QUEUE_SIZE", "4"))
+    INGEST_INSERT_BATCH: int = int(os.getenv("INGEST_INSERT_BATCH", "256"))
+    INGEST_CHECKPOINT_PATH: str = os.getenv(
+        "INGEST_CHECKPOINT_PATH", ".ingest_checkpoint.json"
+    )
+    EMBEDDING_ARTIFACT_PATH: str = os.getenv("EMBEDDING_ARTIFACT_PATH", "")
+    EMBEDDING_MODEL: str = os.getenv(
+        "EMBEDDING_MODEL", "LazarusNLP/all-indobert-base-v4"
+    )
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    EMBEDDING_WORKERS: int = int(os.getenv("EMBEDDING_WORKERS", "1"))
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    ONNX_MODEL_DIR: str = os.getenv("ONNX_MODEL_DIR", "onnx_model")
+    ONNX_QUANTIZED: bool = os.getenv("ONNX_QUANTIZED", "true").lower() == "true"
+    ONNX_INTRA_OP_THREADS: int = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
+    VECTOR_DB_TIMEOUT: float = float(os.getenv("VECTOR_DB_TIMEOUT", "5"))
+    TAVILY_TIMEOUT: float = float(os.getenv("TAVILY_TIMEOUT", "10"))
+    RETRIEVAL_MAX_WORKERS: int = int(os.getenv("RETRIEVAL_MAX_WORKERS", "16"))
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "8"))
+    TAVILY_RATE_LIMIT: float = float(os.getenv("TAVILY_RATE_LIMIT", "5"))
+    OPENROUTER_RATE_LIMIT: float = float(os.getenv("OPENROUTER_RATE_LIMIT", "5"))
+    TAVILY_SEND_DOMAINS: bool = (
+        os.getenv("TAVILY_SEND_DOMAINS", "true").lower() == "true"
+    )
+    WEB_RESULTS_TRUSTED_ONLY: bool = (
+        os.getenv("WEB_RESULTS_TRUSTED_ONLY", "true").lower() == "true"
+    )
+    TAVILY_CACHE_TTL: int = int(os.getenv("TAVILY_CACHE_TTL", "21600"))
+    TAVILY_CACHE_MAX_ENTRIES: int = int(os.getenv("TAVILY_CACHE_MAX_ENTRIES", "2048"))
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_TTL: float = float(os.getenv("CACHE_TTL", "3600"))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_DB_PATH: str = os.getenv("CACHE_DB_PATH", "")
+    SEMANTIC_CACHE_MAX_DISTANCE: float = float(
+        os.getenv("SEMANTIC_CACHE_MAX_DISTANCE", "0.05")
+    )
+    COALESCE_REQUESTS: bool = (
+        os.getenv("COALESCE_REQUESTS", "true").lower() == "true"
+    )
+    SERVE_WORKERS: int = int(os.getenv("SERVE_WORKERS", "0"))
+    SERVE_MAX_WORKERS: int = int(os.getenv("SERVE_MAX_WORKERS", "8"))
+    SERVE_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVE_GRACEFUL_TIMEOUT", "30"))
+    SERVE_MAX_REQUESTS: int = int(os.getenv("SERVE_MAX_REQUESTS", "0"))
+    METRICS_DIR: str = os.getenv("METRICS_DIR", "")
+    WARMUP_ON_STARTUP: bool = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
     FACTCHECK_API_URL: str = os.getenv(
         "FACTCHECK_API_URL", "http://localhost:8000/fact_check"
     )
     FACTCHECK_API_URL_CLI: str = os.getenv(
         "FACTCHECK_API_URL", "http://localhost:8000/fact_check?verbose=true"
     )
+    FACTCHECK_STREAM_API_URL: str = os.getenv(
+        "FACTCHECK_STREAM_API_URL", "http://localhost:8000/fact_check/stream"
+    )
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,155 @@
+"""Precomputed embedding artifacts for model-free deployment.
+
+An artifact is a directory holding ``embeddings.npy`` (float32, one row per
+record, memory-mappable), ``metadata.parquet`` (the record id plus the
+stored text fields) and ``manifest.json`` describing the embedding model and
+the dataset it was built from. Loading an artifact into a vector store needs
+neither the model nor the CSV.
+
+    python -m hoax_detect.data.artifact --output artifacts
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set, Tuple
+import numpy as np
+from hoax_detect.config import settings
+from hoax_detect.services.vector_store import (
+    OUTPUT_FIELDS,
+    VectorStore,
+    frame_entities,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FORMAT_VERSION = 2
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.parquet"
+MANIFEST_FILE = "manifest.json"
+
+
+def dataset_hash(path: str) -> str:
+    """sha256 of the dataset file contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def default_artifact_dir(root: str, model: str, data_hash: str) -> Path:
+    """Versioned directory name derived from the model and dataset hash."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", model).strip("-").lower()
+    return Path(root) / f"{slug}-{data_hash[:12]}"
+
+
+def build_artifact(
+    root: str = "artifacts", dataset_path: Optional[str] = None
+) -> Path:
+    """Embed the dataset once and write it out as a versioned artifact."""
+    import pandas as pd
+    from hoax_detect.data.loader import clean_frame
+    from hoax_detect.services.embedding import embed_batch
+
+    dataset_path = dataset_path or settings.DATASET_PATH
+    data_hash = dataset_hash(dataset_path)
+    out_dir = default_artifact_dir(root, settings.EMBEDDING_MODEL, data_hash)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    df = clean_frame(pd.read_csv(dataset_path))
+    embeddings = embed_batch(df["text"].tolist())
+
+    tmp = out_dir / (EMBEDDINGS_FILE + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, embeddings.astype(np.float32))
+    os.replace(tmp, out_dir / EMBEDDINGS_FILE)
+    df[["id"] + OUTPUT_FIELDS].reset_index(drop=True).to_parquet(
+        out_dir / METADATA_FILE, index=False
+    )
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model": settings.EMBEDDING_MODEL,
+        "dim": int(embeddings.shape[1]),
+        "count": int(len(df)),
+        "dataset_path": os.path.basename(dataset_path),
+        "dataset_sha256": data_hash,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    with open(out_dir / MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return out_dir
+
+
+def load_artifact(
+    path: str, mmap: bool = True
+) -> Tuple[Dict[str, Any], np.ndarray, "pd.DataFrame"]:
+    """Read an artifact's manifest, embedding matrix and metadata."""
+    import pandas as pd
+
+    path = Path(path)
+    with open(path / MANIFEST_FILE, "r") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact format {manifest.get('format_version')}"
+        )
+
+    embeddings = np.load(path / EMBEDDINGS_FILE, mmap_mode="r" if mmap else None)
+    metadata = pd.read_parquet(path / METADATA_FILE)
+    if len(metadata) != manifest["count"] or embeddings.shape != (
+        manifest["count"],
+        manifest["dim"],
+    ):
+        raise ValueError(f"Artifact {path} is inconsistent with its manifest")
+    return manifest, embeddings, metadata
+
+
+def load_artifact_into_store(
+    store: VectorStore, path: str, batch_size: Optional[int] = None
+) -> Tuple[int, Set[str]]:
+    """Bulk-insert artifact rows missing from ``store`` without the model.
+
+    Returns the number of inserted rows and the ids contained in the artifact.
+    """
+    manifest, embeddings, metadata = load_artifact(path)
+    if manifest["model"] != settings.EMBEDDING_MODEL:
+        raise ValueError(
+            f"Artifact was built with {manifest['model']}, "
+            f"but EMBEDDING_MODEL is {settings.EMBEDDING_MODEL}"
+        )
+
+    batch_size = batch_size or settings.INGEST_INSERT_BATCH
+    existing = store.list_ids()
+    positions = np.flatnonzero(~metadata["id"].isin(existing).to_numpy())
+
+    for i in range(0, len(positions), batch_size):
+        rows = positions[i : i + batch_size]
+        batch = metadata.iloc[rows]
+        store.insert(frame_entities(batch, np.asarray(embeddings[rows])))
+    store.flush()
+    return len(positions), set(metadata["id"])
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Build a precomputed embedding artifact from the dataset"
+    )
+    parser.add_argument(
+        "--output", default="artifacts", help="Directory to create the artifact in"
+    )
+    parser.add_argument("--dataset", help="CSV to embed (defaults to DATASET_PATH)")
+    args = parser.parse_args()
+
+    out_dir = build_artifact(args.output, dataset_path=args.dataset)
+    print(f"Wrote artifact to {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
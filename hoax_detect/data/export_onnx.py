@@ -0,0 +1,131 @@
+"""Export the embedding model to ONNX with dynamic int8 quantization.
+
+The sentence-transformers model is split into its transformer, which is
+exported to ``model.onnx`` with dynamic batch and sequence axes and then
+quantized to ``model_int8.onnx`` (int8 weights, activations quantized at run
+time), and its pooling/normalisation, which is recorded in ``manifest.json``
+and applied in NumPy by ``services.onnx_embedding``. The tokenizer is saved
+alongside.
+
+    python -m hoax_detect.data.export_onnx --output onnx_model
+"""
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+from hoax_detect.config import settings
+from hoax_detect.services.onnx_embedding import (
+    FORMAT_VERSION,
+    FP32_FILE,
+    INT8_FILE,
+    MANIFEST_FILE,
+    check_pooling,
+)
+
+INPUT_NAMES = ("input_ids", "attention_mask", "token_type_ids")
+
+
+def export_onnx(
+    output: Optional[str] = None,
+    model_name: Optional[str] = None,
+    opset: int = 14,
+    per_channel: bool = False,
+) -> Dict[str, Any]:
+    """Export and quantize ``model_name`` into ``output``; returns the manifest."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    output = output or settings.ONNX_MODEL_DIR
+    model_name = model_name or settings.EMBEDDING_MODEL
+    os.makedirs(output, exist_ok=True)
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    pooling = next(m for m in model if isinstance(m, Pooling))
+    check_pooling(pooling.get_pooling_mode_str())
+    tokenizer = transformer.tokenizer
+    auto_model = transformer.auto_model.eval()
+
+    sample = tokenizer(["contoh kalimat untuk ekspor"], return_tensors="pt")
+    input_names = [name for name in INPUT_NAMES if name in sample]
+
+    class HiddenStates(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *inputs):
+            return self.inner(**dict(zip(input_names, inputs))).last_hidden_state
+
+    axes = {0: "batch", 1: "sequence"}
+    fp32_path = os.path.join(output, FP32_FILE)
+    start = time.perf_counter()
+    with torch.no_grad():
+        torch.onnx.export(
+            HiddenStates(auto_model),
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: axes for name in [*input_names, "last_hidden_state"]},
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    export_seconds = time.perf_counter() - start
+
+    int8_path = os.path.join(output, INT8_FILE)
+    start = time.perf_counter()
+    quantize_dynamic(
+        fp32_path, int8_path, weight_type=QuantType.QInt8, per_channel=per_channel
+    )
+    quantize_seconds = time.perf_counter() - start
+    tokenizer.save_pretrained(output)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model": model_name,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "max_seq_length": model.max_seq_length,
+        "pooling": pooling.get_pooling_mode_str(),
+        "normalize": any(isinstance(m, Normalize) for m in model),
+        "inputs": input_names,
+        "opset": opset,
+        "per_channel": per_channel,
+        "fp32_mb": round(os.path.getsize(fp32_path) / 2**20, 1),
+        "int8_mb": round(os.path.getsize(int8_path) / 2**20, 1),
+        "export_seconds": round(export_seconds, 1),
+        "quantize_seconds": round(quantize_seconds, 1),
+        "exported_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    with open(os.path.join(output, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    parser.add_argument("--output", help="Directory (defaults to ONNX_MODEL_DIR)")
+    parser.add_argument("--model", help="Model name (defaults to EMBEDDING_MODEL)")
+    parser.add_argument("--opset", type=int, default=14)
+    parser.add_argument(
+        "--per-channel",
+        action="store_true",
+        help="Quantize weights per output channel (slower export, closer to fp32)",
+    )
+    args = parser.parse_args()
+
+    manifest = export_onnx(
+        output=args.output,
+        model_name=args.model,
+        opset=args.opset,
+        per_channel=args.per_channel,
+    )
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
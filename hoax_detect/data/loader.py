@@ -1,60 +1,219 @@
-import pandas as pd
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Dict, Set
 from hoax_detect.config import settings
+from hoax_detect.services.lexical import BM25Builder
+from hoax_detect.services.payload_store import PAYLOAD_FIELDS, PayloadStoreBuilder
 from hoax_detect.services.vector_store import (
-    connect_milvus,
-    create_collection,
-    batch_insert_data,
     clear_collection,
+    get_vector_store,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def load_dataset() -> pd.DataFrame:
+HASH_FIELDS = ["title", "content", "fact", "conclusion", "references", "status"]
+
+
+def load_dataset() -> "pd.DataFrame":
     """Load and validate the dataset from configured CSV path."""
+    import pandas as pd
+
     try:
-        df = pd.read_csv(settings.DATASET_PATH)
-
-        # Validate required columns
-        required_columns = set(settings.COLUMNS)
-        if not required_columns.issubset(df.columns):
-            missing = required_columns - set(df.columns)
-            raise ValueError(f"Dataset missing required columns: {missing}")
-
-        # Clean data
-        df = df.dropna(subset=settings.COLUMNS)
-        df = df[settings.COLUMNS]
-
-        # Create combined text for embedding (content + fact)
-        df["text"] = df["content"] + "\n\n" + df["fact"]
-        df["text"] = df["text"].str.slice(0, 8192)
-        df["content"] = df["content"].str.slice(0, 4096)
-        df["fact"] = df["fact"].str.slice(0, 2048)
-        df["conclusion"] = df["conclusion"].str.slice(0, 2048)
-
-        return df
+        return clean_frame(pd.read_csv(settings.DATASET_PATH))
     except Exception as e:
         raise RuntimeError(f"Failed to load dataset: {e}")
 
 
-def initialize_vector_db(clear_existing: bool = False) -> None:
-    """Initialize the vector database with dataset embeddings."""
-    try:
-        connect_milvus()
+def clean_frame(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Validate, clean and truncate a raw dataset frame (or CSV chunk)."""
+    # Validate required columns
+    required_columns = set(settings.COLUMNS)
+    if not required_columns.issubset(df.columns):
+        missing = required_columns - set(df.columns)
+        raise ValueError(f"Dataset missing required columns: {missing}")
+
+    # Clean data
+    df = df.dropna(subset=settings.COLUMNS)
+    df = df[settings.COLUMNS].copy()
+
+    # Create combined text for embedding (content + fact)
+    df["text"] = df["content"] + "\n\n" + df["fact"]
+    df["text"] = df["text"].str.slice(0, 8192)
+    df["content"] = df["content"].str.slice(0, 4096)
+    df["fact"] = df["fact"].str.slice(0, 2048)
+    df["conclusion"] = df["conclusion"].str.slice(0, 2048)
+    df["status"] = df["status"].str.strip().str.slice(0, 64)
+
+    df["id"] = [row_hash(row) for row in df[HASH_FIELDS].itertuples(index=False)]
+    return df.drop_duplicates(subset="id")
+
+
+def row_hash(values) -> str:
+    """Content hash of a cleaned row, scoped to the embedding model."""
+    payload = json.dumps(
+        [settings.EMBEDDING_MODEL, *map(str, values)], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _checkpoint_owner(store) -> Dict[str, str]:
+    """What a checkpoint was written for: the store (and collection) and model."""
+    return {"store": store.name, "model": settings.EMBEDDING_MODEL}
+
+
+def _read_checkpoint(path: str, owner: Dict[str, str]) -> Set[str]:
+    """Ids a previous run inserted, if its checkpoint belongs to ``owner``."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r") as f:
+        data = json.load(f)
+    if {key: data.get(key) for key in owner} != owner:
+        print(f"Ignoring checkpoint {path}: written for another store or model")
+        return set()
+    return set(data.get("inserted", []))
+
+
+def _write_checkpoint(path: str, owner: Dict[str, str], inserted: Set[str]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({**owner, "inserted": sorted(inserted)}, f)
+    os.replace(tmp, path)
+
+
+def _remove_checkpoint() -> None:
+    if os.path.exists(settings.INGEST_CHECKPOINT_PATH):
+        os.remove(settings.INGEST_CHECKPOINT_PATH)
+
+
+class _SearchIndexes:
+    """BM25 index and payload store built from the cleaned frames of one pass.
+
+    Frames are added as they are read, so the ingest pipeline feeds both from
+    the chunks it already streams instead of reading the CSV again.
+    """
+
+    def __init__(self):
+        self.lexical = BM25Builder()
+        self.payload = PayloadStoreBuilder()
+        self.seen: Set[str] = set()
 
+    def add(self, df: "pd.DataFrame") -> None:
+        for row in df[["id", "text"] + PAYLOAD_FIELDS].to_dict("records"):
+            doc_id = row["id"]
+            if doc_id in self.seen:
+                continue
+            self.seen.add(doc_id)
+            self.lexical.add(doc_id, f"{row['title']}\n{row['text']}")
+            self.payload.add(doc_id, row)
+
+    def save(self) -> None:
+        """Save both after the store is synced."""
+        index = self.lexical.build()
+        index.save(settings.LEXICAL_INDEX_PATH)
+        print(f"Built lexical index over {len(index)} records")
+        store = self.payload.build()
+        store.save(settings.PAYLOAD_STORE_PATH)
+        print(f"Built payload store over {len(store)} records")
+
+
+def initialize_from_artifact(artifact_path: str, clear_existing: bool = False) -> None:
+    """Sync the vector database from a precomputed embedding artifact."""
+    from hoax_detect.data.artifact import load_artifact, load_artifact_into_store
+
+    try:
+        store = get_vector_store()
         if clear_existing:
             print("Clearing existing collection...")
             clear_collection()
+            _remove_checkpoint()
 
-        collection = create_collection()
-        print(f"Using collection: {collection.name}")
-
-        print("Loading dataset...")
-        df = load_dataset()
-        print(f"Found {len(df)} valid records")
+        print(f"Using vector store: {store.name}")
+        print(f"Bulk-loading artifact {artifact_path}...")
+        existing = store.list_ids()
+        inserted_count, artifact_ids = load_artifact_into_store(store, artifact_path)
 
-        print("Inserting embeddings...")
-        inserted_count = batch_insert_data(df)
+        stale = existing - artifact_ids
+        if stale:
+            print(f"Deleting {len(stale)} records not in the artifact...")
+            store.delete(stale)
         print(f"Successfully inserted {inserted_count} records")
 
+        _, _, metadata = load_artifact(artifact_path)
+        indexes = _SearchIndexes()
+        indexes.add(metadata)
+        indexes.save()
+
+    except Exception as e:
+        print(f"Initialization failed: {e}")
+        raise
+
+
+def initialize_vector_db(
+    clear_existing: bool = False, checkpoint_every: int = 1024
+) -> None:
+    """Sync the vector database with the dataset.
+
+    Rows are keyed by a content hash, so only new or changed rows are
+    embedded and inserted, and rows no longer in the dataset are deleted.
+    The CSV is streamed through ``run_ingest_pipeline`` and progress is
+    checkpointed every ``checkpoint_every`` rows so an interrupted run
+    resumes where it stopped. Rows flushed before the interruption are listed
+    by the store itself, so the store, not the checkpoint, decides what is
+    skipped; the checkpoint records which store and model it belongs to.
+    """
+    from hoax_detect.data.pipeline import run_ingest_pipeline
+
+    checkpoint_path = settings.INGEST_CHECKPOINT_PATH
+    try:
+        store = get_vector_store()
+        if clear_existing:
+            print("Clearing existing collection...")
+            clear_collection()
+            _remove_checkpoint()
+
+        print(f"Using vector store: {store.name}")
+
+        owner = _checkpoint_owner(store)
+        checkpointed = _read_checkpoint(checkpoint_path, owner)
+        existing = store.list_ids()
+        if checkpointed:
+            print(
+                f"Resuming an interrupted run: {len(checkpointed & existing)} of "
+                f"its {len(checkpointed)} records are stored"
+            )
+
+        print("Streaming dataset into the vector store...")
+        indexes = _SearchIndexes()
+        stats, seen_ids = run_ingest_pipeline(
+            store,
+            on_chunk=indexes.add,
+            skip_ids=existing,
+            checkpoint_every=checkpoint_every,
+            on_checkpoint=lambda ids: _write_checkpoint(
+                checkpoint_path, owner, (checkpointed & existing) | ids
+            ),
+        )
+
+        stale = existing - seen_ids
+        if stale:
+            print(f"Deleting {len(stale)} removed or changed records...")
+            store.delete(stale)
+
+        print(
+            f"Found {len(seen_ids)} valid records: {stats.rows_inserted} new, "
+            f"{len(stale)} removed, {len(seen_ids) - stats.rows_inserted} unchanged"
+        )
+        print(
+            f"Successfully inserted {stats.rows_inserted} records "
+            f"({stats.rows_per_second:.1f} rows/s)"
+        )
+
+        indexes.save()
+
+        _remove_checkpoint()
+
     except Exception as e:
         print(f"Initialization failed: {e}")
         raise
@@ -70,10 +229,18 @@ def main():
     parser.add_argument(
         "--clear", action="store_true", help="Clear existing collection before loading"
     )
+    parser.add_argument(
+        "--artifact",
+        default=settings.EMBEDDING_ARTIFACT_PATH,
+        help="Load a precomputed embedding artifact instead of running the model",
+    )
     args = parser.parse_args()
 
     try:
-        initialize_vector_db(clear_existing=args.clear)
+        if args.artifact:
+            initialize_from_artifact(args.artifact, clear_existing=args.clear)
+        else:
+            initialize_vector_db(clear_existing=args.clear)
     except Exception as e:
         print(f"Error: {e}")
         return 1
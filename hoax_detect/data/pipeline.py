@@ -0,0 +1,196 @@
+"""Streaming ingestion: chunked CSV read -> clean -> embed -> bulk insert.
+
+Each stage runs in its own thread and hands work to the next through a
+bounded queue, so embedding overlaps with reading and inserting, a slow
+stage applies backpressure to the ones before it, and memory use depends on
+the chunk size and queue depth rather than on the size of the CSV.
+"""
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional, Set
+from hoax_detect.config import settings
+from hoax_detect.services.embedding import embed_batch
+from hoax_detect.services.vector_store import VectorStore, frame_entities
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_DONE = object()
+
+
+class IngestStats:
+    """Row counters and per-stage busy time for one pipeline run."""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_skipped = 0
+        self.rows_embedded = 0
+        self.rows_inserted = 0
+        self.stage_seconds: Dict[str, float] = {
+            "read": 0.0,
+            "embed": 0.0,
+            "insert": 0.0,
+        }
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_inserted / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "rows_read": self.rows_read,
+            "rows_skipped": self.rows_skipped,
+            "rows_embedded": self.rows_embedded,
+            "rows_inserted": self.rows_inserted,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            **{f"{k}_seconds": round(v, 3) for k, v in self.stage_seconds.items()},
+        }
+
+
+def run_ingest_pipeline(
+    store: VectorStore,
+    path: Optional[str] = None,
+    skip_ids: Iterable[str] = (),
+    chunk_size: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    checkpoint_every: int = 1024,
+    on_checkpoint: Optional[Callable[[Set[str]], None]] = None,
+    on_chunk: Optional[Callable[["pd.DataFrame"], None]] = None,
+) -> tuple[IngestStats, Set[str]]:
+    """Stream ``path`` into ``store``, skipping rows whose id is in ``skip_ids``.
+
+    ``on_chunk`` is called from the read stage with every cleaned chunk,
+    including rows that are skipped, so callers can build other indexes from
+    the same pass over the file.
+
+    ``on_checkpoint`` is called with the ids inserted so far each time at
+    least ``checkpoint_every`` rows have been inserted and flushed.
+
+    Returns the run statistics and the ids of every row seen in the file.
+    """
+    import pandas as pd
+    from hoax_detect.data.loader import clean_frame
+
+    path = path or settings.DATASET_PATH
+    chunk_size = chunk_size or settings.INGEST_CHUNK_SIZE
+    queue_size = queue_size or settings.INGEST_QUEUE_SIZE
+    known_ids = set(skip_ids)
+
+    stats = IngestStats()
+    seen_ids: Set[str] = set()
+    to_embed: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    to_insert: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    errors: list = []
+    stop = threading.Event()
+
+    def put(q: "queue.Queue", item) -> bool:
+        """Blocking put that gives up once another stage has failed."""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q: "queue.Queue"):
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def read_stage():
+        try:
+            start = time.perf_counter()
+            for raw in pd.read_csv(path, chunksize=chunk_size):
+                chunk = clean_frame(raw)
+                if on_chunk:
+                    on_chunk(chunk)
+                stats.rows_read += len(chunk)
+                seen_ids.update(chunk["id"])
+                # Skip stored rows and duplicates of rows from earlier chunks.
+                fresh = chunk[~chunk["id"].isin(known_ids)]
+                stats.rows_skipped += len(chunk) - len(fresh)
+                known_ids.update(fresh["id"])
+                chunk = fresh
+                stats.stage_seconds["read"] += time.perf_counter() - start
+                if len(chunk) and not put(to_embed, chunk):
+                    return
+                start = time.perf_counter()
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            put(to_embed, _DONE)
+
+    def embed_stage():
+        try:
+            while True:
+                chunk = get(to_embed)
+                if chunk is _DONE:
+                    break
+                start = time.perf_counter()
+                embeddings = embed_batch(chunk["text"].tolist())
+                stats.rows_embedded += len(chunk)
+                stats.stage_seconds["embed"] += time.perf_counter() - start
+                if not put(to_insert, (chunk, embeddings)):
+                    return
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            put(to_insert, _DONE)
+
+    def insert_stage():
+        inserted: Set[str] = set()
+        since_checkpoint = 0
+        batch_size = settings.INGEST_INSERT_BATCH
+        try:
+            while True:
+                item = get(to_insert)
+                if item is _DONE:
+                    break
+                chunk, embeddings = item
+                start = time.perf_counter()
+                for i in range(0, len(chunk), batch_size):
+                    batch = chunk.iloc[i : i + batch_size]
+                    store.insert(frame_entities(batch, embeddings[i : i + batch_size]))
+                stats.rows_inserted += len(chunk)
+                inserted.update(chunk["id"])
+                since_checkpoint += len(chunk)
+                if since_checkpoint >= checkpoint_every:
+                    store.flush()
+                    if on_checkpoint:
+                        on_checkpoint(inserted)
+                    since_checkpoint = 0
+                stats.stage_seconds["insert"] += time.perf_counter() - start
+            if not stop.is_set():
+                start = time.perf_counter()
+                store.flush()
+                if on_checkpoint and since_checkpoint:
+                    on_checkpoint(inserted)
+                stats.stage_seconds["insert"] += time.perf_counter() - start
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    threads = [
+        threading.Thread(target=read_stage, name="ingest-read"),
+        threading.Thread(target=embed_stage, name="ingest-embed"),
+        threading.Thread(target=insert_stage, name="ingest-insert"),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats.elapsed = time.perf_counter() - stats.started
+    if errors:
+        raise errors[0]
+    return stats, seen_ids
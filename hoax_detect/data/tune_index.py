@@ -0,0 +1,292 @@
+"""Tune the ANN index of the vector store against exact search.
+
+The store's own vectors are copied into a scratch index (a temporary
+directory for the local store, a ``<collection>_tuning`` collection in
+Milvus, dropped afterwards). Dataset titles are embedded as queries and their
+exact cosine top-k over those vectors is the ground truth. Each candidate
+index (type plus build parameters) is built once and searched with every
+candidate search parameter, recording recall@k and per-query latency. The
+grid scales with the corpus: ``nlist`` around sqrt(rows), ``nprobe`` up to
+``nlist``, HNSW ``ef`` from k up.
+
+The fastest setting that reaches ``--target-recall`` is saved to
+``INDEX_TUNING_PATH``. The store reads it at startup and on reload (SIGHUP
+under ``hoax_detect.serve``): its search parameters are used at query time
+and its index type for new collections. ``--apply`` also rebuilds the live
+index with it.
+
+    python -m hoax_detect.data.tune_index --target-recall 0.95 --k 10 --apply
+"""
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from hoax_detect.config import settings
+from hoax_detect.services.utils import l2_normalize
+from hoax_detect.services.vector_store import (
+    INDEX_TYPES,
+    OUTPUT_FIELDS,
+    IndexConfig,
+    LocalVectorStore,
+    MilvusVectorStore,
+    VectorStore,
+    get_vector_store,
+)
+
+FORMAT_VERSION = 1
+HNSW_M = (8, 16, 32)
+HNSW_EF_CONSTRUCTION = 200
+MAX_EF = 512
+INSERT_BATCH_SIZE = 1000
+
+
+def _powers_of_two(low: int, high: int) -> List[int]:
+    values, value = [], 1
+    while value <= high:
+        if value >= low:
+            values.append(value)
+        value *= 2
+    return values
+
+
+def sweep_plan(
+    index_types: Sequence[str], rows: int, k: int
+) -> List[Tuple[str, Dict[str, int], List[Dict[str, int]]]]:
+    """Index builds to try, each with the search parameters to sweep on it."""
+    root = max(1, round(math.sqrt(rows)))
+    nlists = _powers_of_two(max(1, root // 2), min(rows, root * 4))
+    plan = []
+    for index_type in index_types:
+        if index_type == "FLAT":
+            plan.append(("FLAT", {}, [{}]))
+        elif index_type in ("IVF_FLAT", "IVF_SQ8"):
+            for nlist in nlists:
+                probes = [{"nprobe": n} for n in _powers_of_two(1, nlist)]
+                plan.append((index_type, {"nlist": nlist}, probes))
+        elif index_type == "HNSW":
+            efs = [{"ef": ef} for ef in [k] + _powers_of_two(k + 1, MAX_EF)]
+            for m in HNSW_M:
+                build = {"M": m, "efConstruction": HNSW_EF_CONSTRUCTION}
+                plan.append(("HNSW", build, efs))
+        else:
+            raise ValueError(f"Unknown index type: {index_type}")
+    return plan
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Row numbers of the exact cosine top-k for every query."""
+    scores = l2_normalize(queries) @ l2_normalize(vectors).T
+    k = min(k, vectors.shape[0])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, 1)), 1)
+
+
+def _scratch_store(store: VectorStore, workdir: str) -> VectorStore:
+    if isinstance(store, MilvusVectorStore):
+        scratch = MilvusVectorStore(
+            f"{store.collection_name}_tuning",
+            alias=store.alias,
+            config=IndexConfig("FLAT", {}, {}),
+        )
+        scratch.drop()  # left over from an interrupted run
+        return scratch
+    return LocalVectorStore(workdir, nlist=0, nprobe=1)
+
+
+def _fill(scratch: VectorStore, ids: List[str], vectors: np.ndarray) -> None:
+    for start in range(0, len(ids), INSERT_BATCH_SIZE):
+        batch = ids[start : start + INSERT_BATCH_SIZE]
+        blanks = [[""] * len(batch) for _ in OUTPUT_FIELDS]
+        embeddings = vectors[start : start + INSERT_BATCH_SIZE].tolist()
+        scratch.insert([batch] + blanks + [embeddings])
+    scratch.flush()
+
+
+def _set_search_params(scratch: VectorStore, config: IndexConfig) -> None:
+    if isinstance(scratch, MilvusVectorStore):
+        scratch.index_config = config
+    else:
+        scratch.nprobe = config.search_params.get("nprobe", 1)
+
+
+def _measure(
+    scratch: VectorStore, queries: np.ndarray, truth: List[set], k: int
+) -> Dict[str, float]:
+    scratch.search(queries[:1].tolist(), top_k=k, output_fields=[])
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        hits = scratch.search([query.tolist()], top_k=k, output_fields=[])[0]
+        latencies.append(time.perf_counter() - start)
+        recalls.append(len(expected & {hit.id for hit in hits}) / len(expected))
+    ms = np.asarray(latencies) * 1000
+    return {
+        "recall": round(float(np.mean(recalls)), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+    }
+
+
+def _queries(dataset_path: str, sample: int, seed: int) -> List[str]:
+    import pandas as pd
+
+    titles = pd.read_csv(dataset_path)["title"].dropna().astype(str).tolist()
+    random.Random(seed).shuffle(titles)
+    return titles[:sample] if sample else titles
+
+
+def tune(
+    target_recall: float = 0.95,
+    k: int = 10,
+    sample: int = 200,
+    index_types: Optional[Sequence[str]] = None,
+    dataset_path: Optional[str] = None,
+    seed: int = 13,
+    store: Optional[VectorStore] = None,
+) -> Dict[str, Any]:
+    """Sweep the index settings and return the report with the chosen setting."""
+    from hoax_detect.services.embedding import embed_batch
+
+    store = store or get_vector_store()
+    supported = (
+        LocalVectorStore.INDEX_TYPES
+        if isinstance(store, LocalVectorStore)
+        else INDEX_TYPES
+    )
+    index_types = index_types or supported
+    unsupported = set(index_types) - set(supported)
+    if unsupported:
+        raise ValueError(f"{store.name} does not support {', '.join(unsupported)}")
+    ids, vectors = store.export_vectors()
+    if not ids:
+        raise RuntimeError(f"{store.name} is empty; load the dataset first")
+    k = min(k, len(ids))
+
+    texts = _queries(dataset_path or settings.DATASET_PATH, sample, seed)
+    queries = l2_normalize(np.asarray(embed_batch(texts), dtype=np.float32))
+    truth = [{ids[row] for row in rows} for rows in exact_top_k(vectors, queries, k)]
+
+    candidates = []
+    workdir = tempfile.mkdtemp(prefix="tune_index_")
+    scratch = _scratch_store(store, workdir)
+    try:
+        _fill(scratch, ids, vectors)
+        for index_type, index_params, search_grid in sweep_plan(
+            index_types, len(ids), k
+        ):
+            start = time.perf_counter()
+            scratch.rebuild_index(IndexConfig(index_type, index_params, {}))
+            build_seconds = round(time.perf_counter() - start, 2)
+            for search_params in search_grid:
+                config = IndexConfig(index_type, index_params, search_params)
+                _set_search_params(scratch, config)
+                result = _measure(scratch, queries, truth, k)
+                candidates.append(
+                    {**config._asdict(), **result, "build_seconds": build_seconds}
+                )
+                print(
+                    f"{index_type:<9} {json.dumps(index_params):<34} "
+                    f"{json.dumps(search_params):<16} "
+                    f"recall@{k} {result['recall']:.4f}  p50 {result['p50_ms']:.3f} ms"
+                )
+    finally:
+        if isinstance(scratch, MilvusVectorStore):
+            scratch.drop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    passing = [c for c in candidates if c["recall"] >= target_recall]
+    best = min(passing, key=lambda c: (c["p50_ms"], -c["recall"]), default=None)
+    return {
+        "format_version": FORMAT_VERSION,
+        "store": store.name,
+        "index_type": best and best["index_type"],
+        "index_params": best and best["index_params"],
+        "search_params": best and best["search_params"],
+        "recall": best and best["recall"],
+        "p50_ms": best and best["p50_ms"],
+        "k": k,
+        "target_recall": target_recall,
+        "rows": len(ids),
+        "queries": len(queries),
+        "model": settings.EMBEDDING_MODEL,
+        "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "candidates": candidates,
+    }
+
+
+def save(report: Dict[str, Any], path: str) -> None:
+    """Atomically write the tuning result the store reads at startup."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tune the vector index parameters")
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--k", type=int, default=10, help="Recall is measured at k")
+    parser.add_argument(
+        "--sample", type=int, default=200, help="Titles to query with (0 = all)"
+    )
+    parser.add_argument(
+        "--index-types",
+        nargs="+",
+        choices=INDEX_TYPES,
+        help="Index types to sweep (defaults to all the backend supports)",
+    )
+    parser.add_argument(
+        "--dataset", help="CSV with query titles (defaults to DATASET_PATH)"
+    )
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument(
+        "--output", help="Where to save the result (defaults to INDEX_TUNING_PATH)"
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="Rebuild the live index with the result"
+    )
+    args = parser.parse_args()
+
+    report = tune(
+        target_recall=args.target_recall,
+        k=args.k,
+        sample=args.sample,
+        index_types=args.index_types,
+        dataset_path=args.dataset,
+        seed=args.seed,
+    )
+    if report["index_type"] is None:
+        best = max(report["candidates"], key=lambda c: c["recall"])
+        raise SystemExit(
+            f"No setting reached recall@{report['k']} {args.target_recall}; "
+            f"the best was {best['recall']} ({best['index_type']} "
+            f"{best['index_params']} {best['search_params']}). Nothing saved."
+        )
+
+    output = args.output or settings.INDEX_TUNING_PATH
+    save(report, output)
+    print(
+        f"Chose {report['index_type']} {report['index_params']} "
+        f"{report['search_params']}: recall@{report['k']} {report['recall']}, "
+        f"p50 {report['p50_ms']} ms. Saved to {output}"
+    )
+    if args.apply:
+        store = get_vector_store()
+        store.rebuild_index(
+            IndexConfig(
+                report["index_type"], report["index_params"], report["search_params"]
+            )
+        )
+        print(f"Rebuilt the index of {store.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,14 @@ class FactCheckRequest(BaseModel):
     query: str
     use_vector_db: bool = True 
     use_tavily: bool = True
+    fast_path: bool = True
 
 class FactCheckResponse(BaseModel):
     verdict: str
     explanation: str
     sources: List[str] = []
+    error: Optional[str] = None
+    source: str = "llm"
 
 class NewsResult(BaseModel):
     title: str
@@ -23,4 +26,6 @@ class HoaxChunk(BaseModel):
     fact: str
     conclusion: str
     references: str = ""
+    status: Optional[str] = None
     embedding: Optional[List[float]] = None
+    score: Optional[float] = None
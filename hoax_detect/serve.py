@@ -0,0 +1,209 @@
+"""Production server: a gunicorn master forking uvicorn workers.
+
+The master loads everything read-only before forking, so workers share it
+instead of each holding a copy:
+
+- the PyTorch embedding weights (inherited copy-on-write; ``gc.freeze()``
+  keeps the collector from touching, and so copying, preloaded objects),
+- the local vector index (memory-mapped, so its pages sit in the page cache
+  once for all workers),
+- the BM25 index, the payload store, the classifier and the trusted domain
+  list.
+
+Anything holding threads or sockets is created per worker after the fork:
+the Milvus gRPC connection, the ONNX Runtime session (its thread pool does
+not survive a fork), the HTTP clients and the SQLite cache connections. The
+first forward pass also runs in each worker, through the app's startup
+warm-up.
+
+The worker count defaults to the CPUs available to the process (affinity
+mask and cgroup quota), capped at ``SERVE_MAX_WORKERS``, and the inference
+threads are split evenly between the workers. ``kill -HUP`` on the master
+reloads gracefully: the index files are re-read in the master, a new
+generation of workers is forked from it and the old workers finish their
+in-flight requests within ``SERVE_GRACEFUL_TIMEOUT`` before exiting.
+
+With more than one worker, each worker writes its metrics to ``METRICS_DIR``
+(a fresh temporary directory when unset) and ``/metrics`` and
+``/cache_stats`` merge them, so a scrape covers every worker whichever one
+answers it.
+
+    python -m hoax_detect.serve --port 8000
+"""
+import argparse
+import gc
+import logging
+import math
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from gunicorn.app.base import BaseApplication
+from hoax_detect.config import settings
+
+logger = logging.getLogger("hoax_detect.serve")
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: the affinity mask, capped by a cgroup quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    try:
+        quota, period = _read("/sys/fs/cgroup/cpu.max").split()  # cgroup v2
+    except (OSError, ValueError):
+        try:
+            quota = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")  # cgroup v1
+            period = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        except OSError:
+            return None
+    if quota in ("max", "-1"):
+        return None
+    return int(quota) / int(period)
+
+
+def _read(path: str) -> str:
+    with open(path, "r") as f:
+        return f.read().strip()
+
+
+def worker_count(requested: int = 0) -> int:
+    """``requested`` if set, else one worker per available CPU up to the cap."""
+    if requested > 0:
+        return requested
+    return max(1, min(available_cpus(), settings.SERVE_MAX_WORKERS))
+
+
+def _preload_steps() -> List[Tuple[str, Callable[[], Any]]]:
+    from hoax_detect.services import embedding, vector_store
+    from hoax_detect.services.classifier import get_classifier
+    from hoax_detect.services.lexical import get_lexical_index
+    from hoax_detect.services.payload_store import get_payload_store
+    from hoax_detect.services.web_search import get_trusted_domains
+
+    steps = [
+        ("lexical index", get_lexical_index),
+        ("payload store", get_payload_store),
+        ("classifier", get_classifier),
+        ("trusted domains", get_trusted_domains),
+    ]
+    if settings.EMBEDDING_BACKEND.lower() != "onnx":
+        # Weights only: the first forward pass starts torch's thread pool,
+        # which must happen in the workers.
+        steps.insert(0, ("embedding model", embedding.get_model))
+    if settings.VECTOR_STORE_BACKEND.lower() == "local":
+        steps.append(("local index", lambda: vector_store.get_vector_store().reload()))
+    return steps
+
+
+def preload() -> None:
+    """Load the shareable state in the master, before any worker is forked."""
+    for name, step in _preload_steps():
+        try:
+            step()
+            logger.info("Preloaded %s", name)
+        except Exception as e:
+            logger.warning("Preloading %s failed: %s", name, e)
+
+
+def _post_fork(server, worker) -> None:
+    """Give each worker an even share of the CPUs and upstream rate limits."""
+    from hoax_detect import api
+    from hoax_detect.services import metrics
+
+    if settings.METRICS_DIR:
+        metrics.enable_multiprocess(settings.METRICS_DIR)
+
+    api.split_rate_limits(server.cfg.workers)
+    threads = max(1, available_cpus() // server.cfg.workers)
+    if settings.ONNX_INTRA_OP_THREADS == 0:
+        settings.ONNX_INTRA_OP_THREADS = threads
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+def _on_reload(server) -> None:
+    """Re-read the index files in the master so new workers see them."""
+    gc.unfreeze()
+    preload()
+    gc.freeze()
+
+
+class HoaxServer(BaseApplication):
+    """gunicorn application serving ``hoax_detect.api:app``."""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        preload()
+        from hoax_detect.api import app
+
+        gc.collect()
+        gc.freeze()
+        return app
+
+
+def metrics_dir() -> str:
+    """Directory the workers share their metrics through, emptied of old runs."""
+    path = settings.METRICS_DIR or tempfile.mkdtemp(prefix="hoax_metrics_")
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name.endswith(".json"):
+            os.remove(os.path.join(path, name))
+    return path
+
+
+def server_options(host: str, port: int, workers: int) -> Dict[str, Any]:
+    workers = worker_count(workers)
+    if workers > 1:
+        settings.METRICS_DIR = metrics_dir()
+    return {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "graceful_timeout": settings.SERVE_GRACEFUL_TIMEOUT,
+        "max_requests": settings.SERVE_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVE_MAX_REQUESTS // 10,
+        "post_fork": _post_fork,
+        "on_reload": _on_reload,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API with multiple workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.SERVE_WORKERS,
+        help="Worker processes (0 = one per available CPU, up to SERVE_MAX_WORKERS)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    HoaxServer(server_options(args.host, args.port, args.workers)).run()
+
+
+if __name__ == "__main__":
+    main()
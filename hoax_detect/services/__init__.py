@@ -1,11 +1,25 @@
 """Services module initialization."""
-from .embedding import embed_text
+from .embedding import embed_text, embed_batch
 from .vector_store import (
-    search_similar_chunks, 
+    search_similar_chunks,
+    search_similar_chunks_batch,
     connect_milvus, 
     create_collection,
     batch_insert_data,
-    clear_collection
+    clear_collection,
+    get_vector_store,
+    VectorStore,
+    MilvusVectorStore,
+    LocalVectorStore,
 )
-from .llm import call_openrouter, build_prompt
-from .web_search import call_tavily_api, load_trusted_domains
+from .lexical import BM25Index, get_lexical_index, reciprocal_rank_fusion, tokenize
+from .llm import call_openrouter, acall_openrouter, astream_openrouter, build_prompt
+from .prompt import build_prompt_with_stats, PromptStats
+from .web_search import (
+    call_tavily_api,
+    acall_tavily_api,
+    load_trusted_domains,
+    get_trusted_domains,
+    TrustedDomains,
+)
+from .http import UpstreamError
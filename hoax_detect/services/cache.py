@@ -0,0 +1,253 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+import numpy as np
+from hoax_detect.services.utils import l2_normalize
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Case-fold and collapse whitespace so trivial variants share a key."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def query_hash(text: str, *parts: Any) -> str:
+    """Stable hash of the normalised query plus any extra key parts."""
+    key = json.dumps([normalize_query(text), *parts], ensure_ascii=False)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class SQLiteCacheBackend:
+    """Write-through on-disk store shared by the in-memory caches.
+
+    Values must be JSON-serialisable. Embeddings are stored as float32 blobs.
+    Each process opens its own connection, so the file can be shared by
+    forked server workers.
+    """
+
+    def __init__(self, path: str, table: str):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, namespace TEXT, embedding BLOB, "
+                "value TEXT, expires REAL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """This process's connection; SQLite handles must not cross a fork."""
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(
+                self.path, timeout=10, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        expires: float,
+        namespace: str = "",
+        embedding: Optional[np.ndarray] = None,
+    ) -> None:
+        blob = None if embedding is None else embedding.astype(np.float32).tobytes()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, blob, json.dumps(value, ensure_ascii=False), expires),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def items(
+        self,
+    ) -> Iterator[Tuple[str, str, Optional[np.ndarray], Any, float]]:
+        """Yield unexpired ``(key, namespace, embedding, value, expires)`` rows."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE expires < ?", (time.time(),)
+            )
+            rows = conn.execute(
+                f"SELECT key, namespace, embedding, value, expires FROM {self.table} "
+                "ORDER BY expires"
+            ).fetchall()
+        for key, namespace, blob, value, expires in rows:
+            embedding = None if blob is None else np.frombuffer(blob, dtype=np.float32)
+            yield key, namespace, embedding, json.loads(value), expires
+
+
+class TTLCache:
+    """Exact-match LRU cache with per-entry TTL and hit/miss counters."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 3600,
+        backend: Optional[SQLiteCacheBackend] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if backend is not None:
+            for key, _, _, value, expires in backend.items():
+                self._entries[key] = (expires, value)
+            self._evict()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            self._evict()
+        if self.backend is not None:
+            self.backend.put(key, value, expires)
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self.backend is not None:
+            self.backend.delete(key)
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            if self.backend is not None:
+                self.backend.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class SemanticCache:
+    """LRU cache looked up by cosine distance between query embeddings.
+
+    A lookup hits when a cached entry in the same ``namespace`` lies within
+    ``max_distance`` (1 - cosine similarity) of the query embedding.
+    """
+
+    def __init__(
+        self,
+        max_distance: float = 0.05,
+        max_entries: int = 1024,
+        ttl: float = 3600,
+        backend: Optional[SQLiteCacheBackend] = None,
+    ):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        # key -> (namespace, normalised embedding, value, expires)
+        self._entries: "OrderedDict[str, Tuple[str, np.ndarray, Any, float]]" = (
+            OrderedDict()
+        )
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: list = []
+        self._lock = threading.Lock()
+        if backend is not None:
+            for key, namespace, embedding, value, expires in backend.items():
+                if embedding is not None:
+                    self._entries[key] = (namespace, embedding, value, expires)
+            self._evict()
+
+    def get(self, embedding: np.ndarray, namespace: str = "") -> Optional[Any]:
+        query = l2_normalize(np.ravel(embedding))
+        now = time.time()
+        with self._lock:
+            if self._entries:
+                matrix, keys = self._snapshot()
+                similarities = matrix @ query
+                for index in np.argsort(-similarities):
+                    if 1 - similarities[index] > self.max_distance:
+                        break
+                    key = keys[index]
+                    entry_namespace, _, value, expires = self._entries[key]
+                    if entry_namespace != namespace:
+                        continue
+                    if expires < now:
+                        self._remove(key)  # a farther entry may still be live
+                        continue
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def set(self, embedding: np.ndarray, value: Any, namespace: str = "") -> None:
+        vector = l2_normalize(np.ravel(embedding))
+        expires = time.time() + self.ttl
+        key = hashlib.sha256(namespace.encode() + vector.tobytes()).hexdigest()
+        with self._lock:
+            self._entries[key] = (namespace, vector, value, expires)
+            self._entries.move_to_end(key)
+            self._matrix = None
+            self._evict()
+        if self.backend is not None:
+            self.backend.put(key, value, expires, namespace=namespace, embedding=vector)
+
+    def _snapshot(self) -> Tuple[np.ndarray, list]:
+        if self._matrix is None:
+            self._keys = list(self._entries)
+            self._matrix = np.vstack([self._entries[k][1] for k in self._keys])
+        return self._matrix, self._keys
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._matrix = None
+        if self.backend is not None:
+            self.backend.delete(key)
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            self._matrix = None
+            if self.backend is not None:
+                self.backend.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,146 @@
+"""Logistic-regression hoax classifier on top of the query embeddings.
+
+The classifier is a single linear layer over the (L2-normalised) sentence
+embeddings the API already computes, so inference is one matrix-vector
+product per query and runs comfortably on CPU. It is saved as an ``.npz``
+holding the weights, the bias and a JSON manifest with the embedding model
+and evaluation metrics.
+
+Train it with ``python -m hoax_detect.data.train_classifier``.
+"""
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from hoax_detect.config import settings
+from hoax_detect.services.utils import cached_by_mtime, l2_normalize
+
+FORMAT_VERSION = 1
+
+
+def _unit_rows(embeddings: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(embeddings)
+    return l2_normalize(matrix.reshape(-1, matrix.shape[-1]))
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -30, 30)))
+
+
+class HoaxClassifier:
+    """Binary classifier returning the probability that a text is a hoax."""
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: float,
+        manifest: Optional[Dict[str, Any]] = None,
+    ):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+        self.manifest = manifest or {}
+
+    def predict_proba(self, embeddings: np.ndarray) -> np.ndarray:
+        """Hoax probability for each row of ``embeddings`` (one call per batch)."""
+        return _sigmoid(_unit_rows(embeddings) @ self.weights + self.bias)
+
+    def save(self, path: str) -> None:
+        manifest = {"format_version": FORMAT_VERSION, **self.manifest}
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp,
+            weights=self.weights,
+            bias=np.float32(self.bias),
+            manifest=np.array(json.dumps(manifest)),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "HoaxClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            manifest = json.loads(str(data["manifest"]))
+            if manifest.get("format_version") != FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported classifier format {manifest.get('format_version')}"
+                )
+            if manifest.get("model") != settings.EMBEDDING_MODEL:
+                raise ValueError(
+                    f"Classifier was trained on {manifest.get('model')}, "
+                    f"but EMBEDDING_MODEL is {settings.EMBEDDING_MODEL}"
+                )
+            return cls(data["weights"], float(data["bias"]), manifest)
+
+
+def fit_logistic_regression(
+    embeddings: np.ndarray,
+    labels: np.ndarray,
+    l2: float = 1.0,
+    max_iter: int = 25,
+    tol: float = 1e-6,
+) -> Tuple[np.ndarray, float]:
+    """L2-regularised logistic regression fitted with Newton's method (IRLS).
+
+    Returns the weight vector and bias. The bias is not regularised.
+    """
+    x = _unit_rows(embeddings).astype(np.float64)
+    x = np.hstack([x, np.ones((len(x), 1))])
+    y = np.asarray(labels, dtype=np.float64)
+    penalty = np.full(x.shape[1], l2)
+    penalty[-1] = 0.0
+    theta = np.zeros(x.shape[1])
+    for _ in range(max_iter):
+        p = _sigmoid(x @ theta)
+        gradient = x.T @ (p - y) + penalty * theta
+        hessian = (x * (p * (1 - p))[:, None]).T @ x + np.diag(penalty + 1e-9)
+        step = np.linalg.solve(hessian, gradient)
+        theta -= step
+        if np.max(np.abs(step)) < tol:
+            break
+    return theta[:-1].astype(np.float32), float(theta[-1])
+
+
+def evaluate(probabilities: np.ndarray, labels: np.ndarray) -> Dict[str, float]:
+    """Accuracy, precision, recall and F1 at a 0.5 cut-off."""
+    predicted = probabilities >= 0.5
+    labels = np.asarray(labels).astype(bool)
+    tp = int(np.sum(predicted & labels))
+    fp = int(np.sum(predicted & ~labels))
+    fn = int(np.sum(~predicted & labels))
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        "accuracy": round(float(np.mean(predicted == labels)), 4),
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(2 * precision * recall / (precision + recall), 4)
+        if precision + recall
+        else 0.0,
+        "samples": int(len(labels)),
+    }
+
+
+def confident_fraction(
+    probabilities: np.ndarray, labels: np.ndarray, threshold: float
+) -> Dict[str, float]:
+    """Share of samples with confidence >= ``threshold`` and their accuracy."""
+    probabilities = np.asarray(probabilities)
+    confident = np.maximum(probabilities, 1 - probabilities) >= threshold
+    labels = np.asarray(labels).astype(bool)
+    correct = (probabilities >= 0.5) == labels
+    return {
+        "threshold": threshold,
+        "coverage": round(float(np.mean(confident)), 4),
+        "accuracy": round(float(np.mean(correct[confident])), 4)
+        if confident.any()
+        else None,
+    }
+
+
+def get_classifier() -> Optional[HoaxClassifier]:
+    """The trained classifier, or None when disabled or not trained yet.
+
+    The artifact is reloaded when its file changes.
+    """
+    if not settings.CLASSIFIER_ENABLED:
+        return None
+    return cached_by_mtime(settings.CLASSIFIER_PATH, HoaxClassifier.load)
@@ -1,8 +1,118 @@
-from sentence_transformers import SentenceTransformer
-from typing import List
+import atexit
+import threading
+import numpy as np
+from typing import TYPE_CHECKING, List, Optional, Sequence, Union
+from hoax_detect.config import settings
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+    from hoax_detect.services.onnx_embedding import OnnxEncoder
+
+_model = None
+_model_lock = threading.Lock()
+_pool = None
+_pool_workers = 0
+
+
+def get_model() -> Union["SentenceTransformer", "OnnxEncoder"]:
+    """Load the embedding model on first use and reuse it afterwards.
+
+    ``EMBEDDING_BACKEND=onnx`` loads the exported ONNX model instead of the
+    PyTorch one; both expose the same ``encode`` interface.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                backend = settings.EMBEDDING_BACKEND.lower()
+                if backend == "onnx":
+                    from hoax_detect.services.onnx_embedding import load_onnx_encoder
+
+                    _model = load_onnx_encoder()
+                elif backend == "torch":
+                    from sentence_transformers import SentenceTransformer
+
+                    _model = SentenceTransformer(settings.EMBEDDING_MODEL)
+                else:
+                    raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+    return _model
+
+
+def is_model_loaded() -> bool:
+    """Whether the embedding model has already been loaded."""
+    return _model is not None
+
+
+def warm_up() -> None:
+    """Load the model and run one forward pass so the first query is fast."""
+    embed_batch(["warm up"])
+
+
+def _get_pool(workers: int):
+    """Start (or reuse) a CPU process pool for multi-process encoding."""
+    global _pool, _pool_workers
+    if _pool is not None and _pool_workers == workers:
+        return _pool
+    model = get_model()
+    if _pool is not None:
+        model.stop_multi_process_pool(_pool)
+    _pool = model.start_multi_process_pool(target_devices=["cpu"] * workers)
+    _pool_workers = workers
+    return _pool
+
+
+@atexit.register
+def _stop_pool():
+    global _pool
+    if _pool is not None:
+        _model.stop_multi_process_pool(_pool)
+        _pool = None
 
-model = SentenceTransformer("LazarusNLP/all-indobert-base-v4")
 
 def embed_text(text: str) -> List[float]:
     """Convert text to embedding vector."""
-    return model.encode(text).tolist()
+    return embed_batch([text])[0].tolist()
+
+
+def embed_batch(
+    texts: Sequence[str],
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """Convert many texts to a float32 embedding matrix in input order.
+
+    Inputs are sorted by length so each batch is padded only to the length of
+    its own longest text. With ``workers > 1`` the sorted batches are spread
+    across a pool of CPU processes (PyTorch backend only; the ONNX backend
+    parallelises within each batch through ``ONNX_INTRA_OP_THREADS``).
+    """
+    batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+    workers = workers or settings.EMBEDDING_WORKERS
+    model = get_model()
+    if len(texts) == 0:
+        dim = model.get_sentence_embedding_dimension()
+        return np.empty((0, dim), dtype=np.float32)
+
+    order = np.argsort([len(text) for text in texts], kind="stable")[::-1]
+    sorted_texts = [texts[i] for i in order]
+
+    multi_process = hasattr(model, "encode_multi_process")
+    if multi_process and workers > 1 and len(sorted_texts) > batch_size:
+        embeddings = model.encode_multi_process(
+            sorted_texts, _get_pool(workers), batch_size=batch_size
+        )
+    else:
+        embeddings = np.vstack(
+            [
+                model.encode(
+                    sorted_texts[i : i + batch_size],
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                )
+                for i in range(0, len(sorted_texts), batch_size)
+            ]
+        )
+
+    result = np.empty_like(embeddings, dtype=np.float32)
+    result[order] = embeddings
+    return result
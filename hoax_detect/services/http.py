@@ -0,0 +1,300 @@
+import asyncio
+import importlib.util
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+import httpx
+from hoax_detect.config import settings
+from hoax_detect.services.metrics import UPSTREAM_ERRORS, UPSTREAM_RETRIES
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(RuntimeError):
+    """An upstream HTTP service failed after all retries."""
+
+    def __init__(self, service: str, message: str, status_code: Optional[int] = None):
+        super().__init__(f"{service} API error: {message}")
+        self.service = service
+        self.status_code = status_code
+
+
+class _LatencyTracker:
+    """Rolling window of successful request latencies for one service."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self, min_samples: int = 20) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+_latencies: Dict[str, _LatencyTracker] = {}
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_client_lock = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+        keepalive_expiry=60,
+    )
+
+
+def _http2() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_client() -> httpx.Client:
+    """Shared keep-alive client for blocking callers."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(http2=_http2(), limits=_limits())
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for the API's event loop."""
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(http2=_http2(), limits=_limits())
+    return _async_client
+
+
+async def aclose_clients() -> None:
+    """Close the shared clients and their pooled connections."""
+    global _client, _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def _tracker(service: str) -> _LatencyTracker:
+    if service not in _latencies:
+        _latencies[service] = _LatencyTracker()
+    return _latencies[service]
+
+
+def _retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+    """Seconds the upstream asked to wait in ``Retry-After``, if it did."""
+    if response is None or "Retry-After" not in response.headers:
+        return None
+    value = response.headers["Retry-After"]
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+def _retry_delay(
+    attempt: int, response: Optional[httpx.Response], remaining: float
+) -> Optional[float]:
+    """Seconds to wait before retry ``attempt``, or None to stop retrying.
+
+    ``Retry-After`` is honoured in full when it fits in the ``remaining``
+    seconds of the request's timeout; a longer wait gives up instead of
+    retrying early against a throttled upstream. Without it the delay is
+    jittered exponential backoff.
+    """
+    requested = _retry_after(response)
+    if requested is not None:
+        return requested if requested < remaining else None
+    ceiling = min(settings.HTTP_BACKOFF_MAX, settings.HTTP_BACKOFF_BASE * 2**attempt)
+    return random.uniform(0, ceiling)
+
+
+def _failure(
+    service: str, message: str, status_code: Optional[int] = None
+) -> UpstreamError:
+    """Count a failed upstream call and build the error to raise."""
+    UPSTREAM_ERRORS.inc(service=service)
+    return UpstreamError(service, message, status_code=status_code)
+
+
+def _parse(service: str, response: httpx.Response) -> Dict[str, Any]:
+    if response.status_code >= 400:
+        raise _failure(
+            service,
+            f"HTTP {response.status_code}: {response.text[:200]}",
+            status_code=response.status_code,
+        )
+    try:
+        return response.json()
+    except ValueError as e:
+        raise _failure(service, f"invalid JSON response: {e}")
+
+
+def post_json(
+    service: str, url: str, *, headers: Dict[str, str], json: Dict, timeout: float
+) -> Dict[str, Any]:
+    """POST ``json`` with jittered retries on 429/5xx and transport errors.
+
+    ``timeout`` applies to each attempt and also bounds how long a
+    ``Retry-After`` is waited for.
+    """
+    client = get_client()
+    deadline = time.monotonic() + timeout
+    for attempt in range(settings.HTTP_MAX_RETRIES + 1):
+        response = None
+        start = time.perf_counter()
+        try:
+            response = client.post(url, headers=headers, json=json, timeout=timeout)
+        except httpx.TransportError as e:
+            if attempt == settings.HTTP_MAX_RETRIES:
+                raise _failure(service, str(e))
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                _tracker(service).record(time.perf_counter() - start)
+                return _parse(service, response)
+            if attempt == settings.HTTP_MAX_RETRIES:
+                return _parse(service, response)
+        delay = _retry_delay(attempt, response, deadline - time.monotonic())
+        if delay is None:
+            return _parse(service, response)
+        UPSTREAM_RETRIES.inc(service=service)
+        time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def _apost_with_retries(
+    service: str, url: str, headers: Dict[str, str], json: Dict, timeout: float
+) -> Dict[str, Any]:
+    client = get_async_client()
+    deadline = time.monotonic() + timeout
+    for attempt in range(settings.HTTP_MAX_RETRIES + 1):
+        response = None
+        start = time.perf_counter()
+        try:
+            response = await client.post(url, headers=headers, json=json, timeout=timeout)
+        except httpx.TransportError as e:
+            if attempt == settings.HTTP_MAX_RETRIES:
+                raise _failure(service, str(e))
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                _tracker(service).record(time.perf_counter() - start)
+                return _parse(service, response)
+            if attempt == settings.HTTP_MAX_RETRIES:
+                return _parse(service, response)
+        delay = _retry_delay(attempt, response, deadline - time.monotonic())
+        if delay is None:
+            return _parse(service, response)
+        UPSTREAM_RETRIES.inc(service=service)
+        await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def apost_json(
+    service: str,
+    url: str,
+    *,
+    headers: Dict[str, str],
+    json: Dict,
+    timeout: float,
+    hedge: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Async POST with retries and optional request hedging.
+
+    When hedging is enabled and the request is still running after the
+    service's observed p95 latency, a second identical request is sent and
+    whichever succeeds first wins.
+    """
+    hedge = settings.HTTP_HEDGE_ENABLED if hedge is None else hedge
+    hedge_after = _tracker(service).p95() if hedge else None
+    if hedge_after is None:
+        return await _apost_with_retries(service, url, headers, json, timeout)
+
+    primary = asyncio.ensure_future(
+        _apost_with_retries(service, url, headers, json, timeout)
+    )
+    done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    secondary = asyncio.ensure_future(
+        _apost_with_retries(service, url, headers, json, timeout)
+    )
+    pending = {primary, secondary}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def astream_sse(
+    service: str, url: str, *, headers: Dict[str, str], json: Dict, timeout: float
+) -> AsyncIterator[str]:
+    """POST ``json`` and yield the ``data:`` payloads of a Server-Sent Events reply.
+
+    Only opening the stream is retried; once bytes have been yielded a
+    failure is raised to the caller.
+    """
+    client = get_async_client()
+    streamed = False
+    deadline = time.monotonic() + timeout
+    for attempt in range(settings.HTTP_MAX_RETRIES + 1):
+        try:
+            async with client.stream(
+                "POST", url, headers=headers, json=json, timeout=timeout
+            ) as response:
+                delay = None
+                if response.status_code in RETRY_STATUSES and (
+                    attempt < settings.HTTP_MAX_RETRIES
+                ):
+                    delay = _retry_delay(
+                        attempt, response, deadline - time.monotonic()
+                    )
+                if delay is not None:
+                    UPSTREAM_RETRIES.inc(service=service)
+                    await asyncio.sleep(delay)
+                    continue
+                if response.status_code >= 400:
+                    await response.aread()
+                    _parse(service, response)
+                async for line in response.aiter_lines():
+                    if line.startswith("data:"):
+                        data = line[len("data:") :].strip()
+                        if data == "[DONE]":
+                            return
+                        streamed = True
+                        yield data
+                return
+        except httpx.TransportError as e:
+            # Retrying after a yield would replay the answer to the consumer.
+            if streamed or attempt == settings.HTTP_MAX_RETRIES:
+                raise _failure(service, str(e))
+            UPSTREAM_RETRIES.inc(service=service)
+            await asyncio.sleep(
+                _retry_delay(attempt, None, deadline - time.monotonic())
+            )
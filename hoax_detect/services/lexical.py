@@ -0,0 +1,191 @@
+"""BM25 lexical index over hoax titles and texts.
+
+Exact names, numbers and slogans ("Killer of the Year") are often missed by
+the embedding search, so a compact inverted index is built at ingest time
+and its hits are fused with vector hits using reciprocal-rank fusion.
+
+Postings are stored CSR-style in NumPy arrays (``indptr``, ``doc_ids``,
+``tfs``) and saved as a single ``.npz`` file that is loaded once and cached.
+"""
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from hoax_detect import STOPWORDS_PATH
+from hoax_detect.config import settings
+from hoax_detect.services.utils import cached_by_mtime
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+@lru_cache(maxsize=1)
+def load_stopwords() -> frozenset:
+    """Load the Indonesian stopword list."""
+    with open(STOPWORDS_PATH, "r") as f:
+        return frozenset(json.load(f))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens with Indonesian stopwords and ``-nya`` removed."""
+    stopwords = load_stopwords()
+    tokens = []
+    for token in _TOKEN.findall(unicodedata.normalize("NFKC", text).casefold()):
+        if token.endswith("nya") and len(token) > 5:
+            token = token[:-3]
+        if token in stopwords or (len(token) < 2 and not token.isdigit()):
+            continue
+        tokens.append(token)
+    return tokens
+
+
+class BM25Builder:
+    """Accumulates documents and produces a ``BM25Index``."""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+
+    def add(self, doc_id: str, text: str) -> None:
+        doc = len(self.ids)
+        tokens = tokenize(text)
+        self.ids.append(doc_id)
+        self.lengths.append(len(tokens))
+        for token in tokens:
+            counts = self.postings.setdefault(token, {})
+            counts[doc] = counts.get(doc, 0) + 1
+
+    def build(self) -> "BM25Index":
+        vocabulary = sorted(self.postings)
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        doc_ids, tfs = [], []
+        for i, term in enumerate(vocabulary):
+            counts = self.postings[term]
+            docs = sorted(counts)
+            doc_ids.extend(docs)
+            tfs.extend(counts[d] for d in docs)
+            indptr[i + 1] = len(doc_ids)
+        return BM25Index(
+            ids=np.array(self.ids, dtype=object),
+            vocabulary=vocabulary,
+            indptr=indptr,
+            doc_ids=np.array(doc_ids, dtype=np.int32),
+            tfs=np.array(tfs, dtype=np.float32),
+            lengths=np.array(self.lengths, dtype=np.float32),
+        )
+
+
+class BM25Index:
+    """Okapi BM25 over CSR postings."""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        vocabulary: Sequence[str],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        lengths: np.ndarray,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.ids = ids
+        self.terms = {term: i for i, term in enumerate(vocabulary)}
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.lengths = lengths
+        self.k1 = k1
+        self.b = b
+        n = len(ids)
+        df = np.diff(indptr).astype(np.float32)
+        self.idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+        average = float(lengths.mean()) if n else 0.0
+        self._norm = k1 * (1 - b + b * lengths / max(average, 1e-9))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(
+        self, query: str, top_k: int = 5, min_score: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """Return ``(id, score)`` pairs for the best ``top_k`` documents.
+
+        ``min_score`` drops documents scoring below that fraction of the best
+        score the query's terms could reach (every term matched with a very
+        high frequency), so a single shared common word is not a match.
+        """
+        term_ids = {self.terms[t] for t in tokenize(query) if t in self.terms}
+        if not term_ids or not len(self.ids):
+            return []
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term in term_ids:
+            start, end = self.indptr[term], self.indptr[term + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.tfs[start:end]
+            scores[docs] += self.idf[term] * tf * (self.k1 + 1) / (tf + self._norm[docs])
+        if min_score > 0:
+            ceiling = float(self.idf[list(term_ids)].sum()) * (self.k1 + 1)
+            scores[scores < min_score * ceiling] = 0
+        k = min(top_k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(str(self.ids[i]), float(scores[i])) for i in best]
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp,
+            ids=self.ids.astype(str),
+            vocabulary=np.array(sorted(self.terms, key=self.terms.get), dtype=str),
+            indptr=self.indptr,
+            doc_ids=self.doc_ids,
+            tfs=self.tfs,
+            lengths=self.lengths,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                ids=data["ids"].astype(object),
+                vocabulary=data["vocabulary"].tolist(),
+                indptr=data["indptr"],
+                doc_ids=data["doc_ids"],
+                tfs=data["tfs"],
+                lengths=data["lengths"],
+            )
+
+
+def build_lexical_index(
+    docs: Iterable[Tuple[str, str]], path: Optional[str] = None
+) -> BM25Index:
+    """Build the index from ``(id, text)`` pairs and save it."""
+    builder = BM25Builder()
+    for doc_id, text in docs:
+        builder.add(doc_id, text)
+    index = builder.build()
+    index.save(path or settings.LEXICAL_INDEX_PATH)
+    return index
+
+
+def get_lexical_index() -> Optional[BM25Index]:
+    """Return the saved index, reloading only when the file changes."""
+    return cached_by_mtime(settings.LEXICAL_INDEX_PATH, BM25Index.load)
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = 60
+) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists; each list contributes ``1 / (k + rank)``."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -1,18 +1,27 @@
+import json
 import os
-import requests
-from typing import List, Optional
-from hoax_detect.models import HoaxChunk, NewsResult
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from hoax_detect.config import settings
+from hoax_detect.services.http import (
+    UpstreamError,
+    apost_json,
+    astream_sse,
+    post_json,
+)
+from hoax_detect.services.prompt import build_prompt, build_prompt_with_stats
 
+DEFAULT_MODEL = "google/gemini-2.0-flash-lite-001"
 
-def call_openrouter(
-    prompt: str, model: str = "google/gemini-2.0-flash-lite-001", max_tokens: int = 1024
-) -> Optional[str]:
-    """Call OpenRouter API with the constructed prompt."""
+
+def _openrouter_request(
+    prompt: str, model: str, max_tokens: int
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """Build the URL, headers and payload for a chat completion."""
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
         raise ValueError("OPENROUTER_API_KEY not set in environment")
 
-    url = "https://openrouter.ai/api/v1/chat/completions"
+    url = f"{settings.OPENROUTER_BASE_URL}/chat/completions"
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
@@ -28,51 +37,52 @@ def call_openrouter(
         ],
         "max_tokens": max_tokens,
     }
+    return url, headers, payload
+
 
+def _completion_text(data: Dict[str, Any]) -> Optional[str]:
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
-        response.raise_for_status()
-        data = response.json()
         return data["choices"][0]["message"]["content"]
-    except Exception as e:
-        raise RuntimeError(f"OpenRouter API error: {e}")
+    except (KeyError, IndexError, TypeError) as e:
+        raise UpstreamError("OpenRouter", f"unexpected response shape: {e}")
 
 
-def build_prompt(
-    user_query: str,
-    retrieved_chunks: List[HoaxChunk],
-    tavily_results: List[NewsResult] = None,
-) -> str:
-    """Build a prompt for the LLM using the user query and retrieved context."""
-    context = "Database Results:\n\n"
-    for i, chunk in enumerate(retrieved_chunks, 1):
-        context += (
-            f"\n---\n"
-            f"Title: {chunk.title}\n"
-            f"Content: {chunk.content}\n"
-            f"Fact: {chunk.fact}\n"
-            f"Conclusion: {chunk.conclusion}\n"
-            f"References: {chunk.references if chunk.references else 'None'}\n"
-        )
+def call_openrouter(
+    prompt: str, model: str = DEFAULT_MODEL, max_tokens: int = 1024
+) -> Optional[str]:
+    """Call OpenRouter API with the constructed prompt."""
+    url, headers, payload = _openrouter_request(prompt, model, max_tokens)
+    data = post_json("OpenRouter", url, headers=headers, json=payload, timeout=60)
+    return _completion_text(data)
 
-    if tavily_results:
-        context += "\n\nWeb Search Results:"
-        for i, res in enumerate(tavily_results, 1):
-            context += (
-                f"\nResult {i}:\n"
-                f"Title: {res.title}\n"
-                f"URL: {res.url}\n"
-                f"Content: {res.content}\n"
-                f"Score: {res.score}\n"
-            )
 
-    return (
-        f"User Query:\n{user_query}\n"
-        f"\nRetrieved Context:\n{context}\n"
-        "Based on the above information, determine if the user query is factual or a hoax. "
-        "Provide:\n"
-        "1. A clear verdict (HOAKS or FAKTA)\n"
-        "2. A detailed explanation in Indonesian\n"
-        "3. Sources used (if any)\n"
-        "4. References from the database (if any)\n"
+async def acall_openrouter(
+    prompt: str, model: str = DEFAULT_MODEL, max_tokens: int = 1024
+) -> Optional[str]:
+    """Async variant of ``call_openrouter`` on the shared pooled client."""
+    url, headers, payload = _openrouter_request(prompt, model, max_tokens)
+    data = await apost_json(
+        "OpenRouter", url, headers=headers, json=payload, timeout=60
     )
+    return _completion_text(data)
+
+
+async def astream_openrouter(
+    prompt: str, model: str = DEFAULT_MODEL, max_tokens: int = 1024
+) -> AsyncIterator[str]:
+    """Stream completion tokens from OpenRouter as they are generated."""
+    url, headers, payload = _openrouter_request(prompt, model, max_tokens)
+    payload["stream"] = True
+    async for data in astream_sse(
+        "OpenRouter", url, headers=headers, json=payload, timeout=60
+    ):
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        if "error" in chunk:
+            raise UpstreamError("OpenRouter", str(chunk["error"]))
+        for choice in chunk.get("choices", []):
+            token = (choice.get("delta") or {}).get("content")
+            if token:
+                yield token
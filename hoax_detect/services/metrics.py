@@ -0,0 +1,464 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Only counters, gauges and histograms with string labels are needed, so they
+are implemented here rather than pulling in a client library. ``span`` times
+a block into ``STAGE_SECONDS`` and ``render`` produces the ``/metrics`` body.
+
+Under several worker processes each worker only sees its own requests, so
+``enable_multiprocess`` makes every worker write a snapshot of its metrics to
+a shared directory about once a second (and on exit), and ``render`` merges
+all snapshots. Counters and histograms are summed over every worker that
+ever wrote one, so they stay monotonic when workers are replaced. Gauges are
+summed over live workers, or reported per worker (with a ``pid`` label) when
+a sum means nothing, like a hit ratio.
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+_registry: List["_Metric"] = []
+_collectors: List[Callable[[], None]] = []
+_multiprocess_dir: Optional[str] = None
+FLUSH_INTERVAL = 1.0
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    """Named, labelled metric registered for ``render``."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def state(self) -> List[Any]:
+        """JSON-serialisable copy of the values, for a process snapshot."""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, snapshots: List[Tuple[int, bool, List[Any]]]) -> Dict:
+        """Sum the values of every snapshot."""
+        merged: Dict[Tuple[str, ...], float] = {}
+        for _, _, state in snapshots:
+            for key, value in state:
+                merged[tuple(key)] = merged.get(tuple(key), 0) + value
+        return merged
+
+    @abstractmethod
+    def samples(self, values: Optional[Dict] = None) -> List[str]:
+        """Sample lines of the local values, or of merged ``values``."""
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self, values: Optional[Dict] = None) -> List[str]:
+        with self._lock:
+            items = sorted((self._values if values is None else values).items())
+        labelnames = self.labelnames
+        if items and len(items[0][0]) > len(labelnames):
+            labelnames += ("pid",)
+        return [
+            f"{self.name}{_labels(labelnames, key)} {_number(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down.
+
+    Across worker processes the values of live workers are summed, or with
+    ``per_process=True`` reported separately under a ``pid`` label.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, *args, per_process: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.per_process = per_process
+
+    def merge(self, snapshots: List[Tuple[int, bool, List[Any]]]) -> Dict:
+        merged: Dict[Tuple[str, ...], float] = {}
+        for pid, alive, state in snapshots:
+            if not alive:
+                continue
+            for key, value in state:
+                key = tuple(key) + ((str(pid),) if self.per_process else ())
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        """Increment for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observed values."""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts incl. +Inf, sum)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def state(self) -> List[Any]:
+        with self._lock:
+            return [[list(k), list(c), s] for k, (c, s) in self._values.items()]
+
+    def merge(self, snapshots: List[Tuple[int, bool, List[Any]]]) -> Dict:
+        merged: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+        for _, _, state in snapshots:
+            for key, counts, total in state:
+                key = tuple(key)
+                if key in merged:
+                    old_counts, old_total = merged[key]
+                    counts = [a + b for a, b in zip(old_counts, counts)]
+                    total += old_total
+                merged[key] = (list(counts), total)
+        return merged
+
+    def samples(self, values: Optional[Dict] = None) -> List[str]:
+        with self._lock:
+            source = self._values if values is None else values
+            items = sorted((k, (list(c), s)) for k, (c, s) in source.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "hoax_stage_seconds",
+    "Time spent in each fact-check stage.",
+    labelnames=["stage"],
+)
+REQUEST_SECONDS = Histogram(
+    "hoax_request_seconds",
+    "End-to-end request latency by endpoint.",
+    labelnames=["endpoint"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "hoax_requests_in_flight",
+    "Requests currently being processed by endpoint.",
+    labelnames=["endpoint"],
+)
+REQUEST_ERRORS = Counter(
+    "hoax_request_errors_total",
+    "Requests that failed by endpoint.",
+    labelnames=["endpoint"],
+)
+UPSTREAM_ERRORS = Counter(
+    "hoax_upstream_errors_total",
+    "Upstream calls that failed after all retries.",
+    labelnames=["service"],
+)
+UPSTREAM_RETRIES = Counter(
+    "hoax_upstream_retries_total",
+    "Upstream call attempts that were retried.",
+    labelnames=["service"],
+)
+SOURCE_FAILURES = Counter(
+    "hoax_retrieval_source_failures_total",
+    "Retrieval sources that timed out or failed and were skipped.",
+    labelnames=["source", "reason"],
+)
+PROMPT_TOKENS = Histogram(
+    "hoax_prompt_tokens",
+    "Estimated size of the prompts sent to the LLM.",
+    buckets=(128, 256, 512, 1024, 1536, 2048, 3072, 4096, 8192, 16384),
+)
+PROMPT_ITEMS = Counter(
+    "hoax_prompt_items_total",
+    "Retrieved context items by source and whether they made it into the prompt.",
+    labelnames=["source", "result"],
+)
+FAST_PATH = Counter(
+    "hoax_fast_path_total",
+    "Requests answered from a stored fact check, and those that fell through.",
+    labelnames=["result"],
+)
+CLASSIFIER_DECISIONS = Counter(
+    "hoax_classifier_decisions_total",
+    "Classifier outcomes: skipped web search (confident, with a close "
+    "database match) or passed.",
+    labelnames=["result"],
+)
+COALESCED_REQUESTS = Counter(
+    "hoax_coalesced_requests_total",
+    "Requests that joined an identical in-flight request instead of running "
+    "their own retrieval and LLM calls.",
+    labelnames=["endpoint"],
+)
+CACHE_HIT_RATE = Gauge(
+    "hoax_cache_hit_ratio",
+    "Hit ratio of each cache since startup.",
+    labelnames=["cache"],
+    per_process=True,
+)
+CACHE_REQUESTS = Gauge(
+    "hoax_cache_requests",
+    "Cache lookups since startup by result.",
+    labelnames=["cache", "result"],
+)
+CACHE_ENTRIES = Gauge(
+    "hoax_cache_entries",
+    "Entries currently held by each cache.",
+    labelnames=["cache"],
+)
+COALESCE_IN_FLIGHT = Gauge(
+    "hoax_coalesce_in_flight",
+    "Distinct computations currently shared by coalesced requests.",
+    labelnames=["endpoint"],
+)
+
+
+_recorded: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "recorded_spans", default=None
+)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Record the duration of the block under ``stage``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        recorded = _recorded.get()
+        if recorded is not None:
+            recorded[stage] = recorded.get(stage, 0.0) + elapsed
+
+
+@contextmanager
+def record_spans() -> Iterator[Dict[str, float]]:
+    """Also collect the seconds spent in each stage inside the block.
+
+    Only spans run in the same context (thread or task) are seen.
+    """
+    recorded: Dict[str, float] = {}
+    token = _recorded.set(recorded)
+    try:
+        yield recorded
+    finally:
+        _recorded.reset(token)
+
+
+@contextmanager
+def track_request(endpoint: str) -> Iterator[None]:
+    """In-flight gauge, latency histogram and error counter for a request."""
+    start = time.perf_counter()
+    with REQUESTS_IN_FLIGHT.track(endpoint=endpoint):
+        try:
+            yield
+        except BaseException:
+            REQUEST_ERRORS.inc(endpoint=endpoint)
+            raise
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+
+
+def record_cache_stats(name: str, stats: Dict) -> None:
+    """Copy a cache's ``stats()`` into the cache gauges."""
+    CACHE_HIT_RATE.set(stats["hit_rate"], cache=name)
+    CACHE_REQUESTS.set(stats["hits"], cache=name, result="hit")
+    CACHE_REQUESTS.set(stats["misses"], cache=name, result="miss")
+    CACHE_ENTRIES.set(stats["entries"], cache=name)
+
+
+def add_collector(collect: Callable[[], None]) -> None:
+    """Run ``collect`` before rendering or snapshotting, to refresh gauges."""
+    _collectors.append(collect)
+
+
+def _collect() -> None:
+    for collect in _collectors:
+        collect()
+
+
+def enable_multiprocess(directory: str) -> None:
+    """Share this process's metrics through snapshots in ``directory``.
+
+    Call it in each worker after the fork: it starts the thread that writes
+    the snapshots.
+    """
+    global _multiprocess_dir
+    os.makedirs(directory, exist_ok=True)
+    _multiprocess_dir = directory
+    threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+    atexit.register(_write_snapshot)
+
+
+def multiprocess_enabled() -> bool:
+    return _multiprocess_dir is not None
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            _write_snapshot()
+        except Exception:
+            pass
+
+
+def _write_snapshot() -> None:
+    if _multiprocess_dir is None:
+        return
+    _collect()
+    snapshot = {metric.name: metric.state() for metric in _registry}
+    path = os.path.join(_multiprocess_dir, f"{os.getpid()}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, path)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_snapshots() -> List[Tuple[int, bool, Dict[str, Any]]]:
+    snapshots = []
+    for name in os.listdir(_multiprocess_dir):
+        if not name.endswith(".json"):
+            continue
+        pid = int(name[: -len(".json")])
+        try:
+            with open(os.path.join(_multiprocess_dir, name), "r") as f:
+                snapshots.append((pid, _alive(pid), json.load(f)))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def merged_values() -> Dict[str, Dict]:
+    """Every metric's values merged over all worker processes."""
+    _write_snapshot()
+    snapshots = _read_snapshots()
+    return {
+        metric.name: metric.merge(
+            [(pid, alive, data.get(metric.name, [])) for pid, alive, data in snapshots]
+        )
+        for metric in _registry
+    }
+
+
+def cache_stats(merged: Dict[str, Dict]) -> Dict[str, Dict[str, Any]]:
+    """Per-cache ``stats()`` rebuilt from ``merged_values()``."""
+    stats: Dict[str, Dict[str, Any]] = {}
+    for (cache, result), value in merged[CACHE_REQUESTS.name].items():
+        entry = stats.setdefault(cache, {"entries": 0, "hits": 0, "misses": 0})
+        entry["hits" if result == "hit" else "misses"] += int(value)
+    for (cache,), value in merged[CACHE_ENTRIES.name].items():
+        stats.setdefault(cache, {"entries": 0, "hits": 0, "misses": 0})
+        stats[cache]["entries"] += int(value)
+    for entry in stats.values():
+        total = entry["hits"] + entry["misses"]
+        entry["hit_rate"] = entry["hits"] / total if total else 0.0
+    return stats
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text format.
+
+    With ``enable_multiprocess`` the values of every worker are merged.
+    """
+    _collect()
+    merged = merged_values() if _multiprocess_dir is not None else {}
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.header())
+        lines.extend(metric.samples(merged.get(metric.name)))
+    return "\n".join(lines) + "\n"
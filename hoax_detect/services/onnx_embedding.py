@@ -0,0 +1,133 @@
+"""ONNX Runtime encoder for the sentence embedding model.
+
+A drop-in for the subset of ``SentenceTransformer`` that ``embedding.py``
+uses (``encode`` and ``get_sentence_embedding_dimension``), running an
+exported, optionally int8-quantized, transformer on the CPU execution
+provider. Pooling and normalisation are done in NumPy as described by the
+export manifest, so serving needs neither torch nor sentence-transformers.
+
+Export the model with ``python -m hoax_detect.data.export_onnx``.
+"""
+import json
+import os
+from typing import Any, Dict, Sequence
+import numpy as np
+from hoax_detect.config import settings
+from hoax_detect.services.utils import l2_normalize
+
+MANIFEST_FILE = "manifest.json"
+FP32_FILE = "model.onnx"
+INT8_FILE = "model_int8.onnx"
+FORMAT_VERSION = 1
+# sentence-transformers pooling modes ``_pool`` reproduces.
+POOLING_MODES = ("cls", "max", "mean")
+
+
+def check_pooling(mode: str) -> None:
+    """Raise unless ``_pool`` computes the same vectors as the PyTorch model."""
+    if mode not in POOLING_MODES:
+        raise ValueError(
+            f"Unsupported pooling mode {mode!r} for the ONNX backend "
+            f"(supported: {', '.join(POOLING_MODES)})"
+        )
+
+
+def _pool(hidden: np.ndarray, mask: np.ndarray, mode: str) -> np.ndarray:
+    if mode == "cls":
+        return hidden[:, 0]
+    mask = mask[:, :, None].astype(hidden.dtype)
+    if mode == "max":
+        return np.where(mask > 0, hidden, -1e9).max(axis=1)
+    return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+
+class OnnxEncoder:
+    """Tokenizer plus an ONNX Runtime session producing sentence embeddings."""
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = True,
+        intra_op_threads: int = 0,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(model_dir, MANIFEST_FILE), "r") as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported ONNX export format {self.manifest.get('format_version')}"
+            )
+        if self.manifest.get("model") != settings.EMBEDDING_MODEL:
+            raise ValueError(
+                f"ONNX model was exported from {self.manifest.get('model')}, "
+                f"but EMBEDDING_MODEL is {settings.EMBEDDING_MODEL}"
+            )
+        check_pooling(self.manifest.get("pooling"))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        self.path = os.path.join(model_dir, INT8_FILE if quantized else FP32_FILE)
+        self.session = ort.InferenceSession(
+            self.path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_seq_length = self.manifest["max_seq_length"]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.manifest["dimension"]
+
+    def _encode_batch(self, texts: Sequence[str]) -> np.ndarray:
+        tokens = self.tokenizer(
+            list(texts),
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        feed = {
+            name: value.astype(np.int64)
+            for name, value in tokens.items()
+            if name in self.input_names
+        }
+        hidden = self.session.run(None, feed)[0]
+        embeddings = _pool(hidden, tokens["attention_mask"], self.manifest["pooling"])
+        if self.manifest.get("normalize"):
+            return l2_normalize(embeddings)
+        return embeddings.astype(np.float32)
+
+    def encode(
+        self,
+        sentences: Sequence[str],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **kwargs,
+    ) -> np.ndarray:
+        """Embed ``sentences`` in batches (mirrors ``SentenceTransformer.encode``)."""
+        if len(sentences) == 0:
+            return np.empty((0, self.get_sentence_embedding_dimension()), np.float32)
+        return np.vstack(
+            [
+                self._encode_batch(sentences[i : i + batch_size])
+                for i in range(0, len(sentences), batch_size)
+            ]
+        )
+
+
+def load_onnx_encoder() -> OnnxEncoder:
+    """The encoder configured by the ``ONNX_*`` settings."""
+    if not os.path.exists(os.path.join(settings.ONNX_MODEL_DIR, MANIFEST_FILE)):
+        raise RuntimeError(
+            f"No ONNX export in {settings.ONNX_MODEL_DIR}; "
+            "run `python -m hoax_detect.data.export_onnx` first"
+        )
+    return OnnxEncoder(
+        settings.ONNX_MODEL_DIR,
+        quantized=settings.ONNX_QUANTIZED,
+        intra_op_threads=settings.ONNX_INTRA_OP_THREADS,
+    )
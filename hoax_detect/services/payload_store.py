@@ -0,0 +1,157 @@
+"""Compact columnar store of the fields returned with search hits.
+
+Vector search asks the store for ids and scores only; the fields of the hits
+that pass the threshold are then looked up here. Each field is kept as one
+UTF-8 blob with an offsets array, so the whole corpus costs one byte buffer
+per field and a lookup decodes just the requested rows. Ids are content
+hashes, so a stale file can miss rows but never return the wrong fields for
+an id; misses are fetched from the vector store and every resolved row is
+kept in an LRU cache of ``HoaxChunk``s.
+
+The loader rebuilds the file together with the BM25 index.
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from hoax_detect.config import settings
+from hoax_detect.models import HoaxChunk
+from hoax_detect.services.cache import TTLCache
+from hoax_detect.services.utils import cached_by_mtime
+
+PAYLOAD_FIELDS = ["title", "content", "fact", "conclusion", "references", "status"]
+
+
+class PayloadStore:
+    """Per-field UTF-8 blobs with row offsets, looked up by id."""
+
+    def __init__(
+        self, ids: np.ndarray, columns: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    ):
+        self.ids = ids
+        self.columns = columns
+        self._rows = {str(doc_id): row for row, doc_id in enumerate(ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def get(self, doc_id: str) -> Optional[Dict[str, str]]:
+        row = self._rows.get(doc_id)
+        if row is None:
+            return None
+        fields = {}
+        for field, (blob, offsets) in self.columns.items():
+            fields[field] = blob[offsets[row] : offsets[row + 1]].tobytes().decode()
+        return fields
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> "PayloadStore":
+        builder = PayloadStoreBuilder()
+        for doc_id, fields in records:
+            builder.add(doc_id, fields)
+        return builder.build()
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp.npz"
+        arrays = {"ids": self.ids}
+        for field, (blob, offsets) in self.columns.items():
+            arrays[f"{field}.blob"] = blob
+            arrays[f"{field}.offsets"] = offsets
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PayloadStore":
+        with np.load(path, allow_pickle=False) as data:
+            columns = {
+                field: (data[f"{field}.blob"], data[f"{field}.offsets"])
+                for field in PAYLOAD_FIELDS
+                if f"{field}.blob" in data.files
+            }
+            return cls(data["ids"], columns)
+
+
+class PayloadStoreBuilder:
+    """Accumulates rows and produces a ``PayloadStore``."""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.values: Dict[str, List[bytes]] = {field: [] for field in PAYLOAD_FIELDS}
+
+    def add(self, doc_id: str, fields: Dict[str, Any]) -> None:
+        self.ids.append(doc_id)
+        for field in PAYLOAD_FIELDS:
+            value = fields.get(field)
+            self.values[field].append(b"" if value is None else str(value).encode())
+
+    def build(self) -> PayloadStore:
+        columns = {}
+        for field, encoded in self.values.items():
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(v) for v in encoded], out=offsets[1:])
+            columns[field] = (np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+        return PayloadStore(np.array(self.ids, dtype=str), columns)
+
+
+def build_payload_store(
+    records: Iterable[Tuple[str, Dict[str, Any]]], path: Optional[str] = None
+) -> PayloadStore:
+    """Build the store from ``(id, fields)`` pairs and save it."""
+    store = PayloadStore.from_records(records)
+    store.save(path or settings.PAYLOAD_STORE_PATH)
+    return store
+
+
+def get_payload_store() -> Optional[PayloadStore]:
+    """Return the saved store, reloading only when the file changes."""
+    return cached_by_mtime(settings.PAYLOAD_STORE_PATH, PayloadStore.load)
+
+
+_chunk_cache: Optional[TTLCache] = None
+_chunk_cache_lock = threading.Lock()
+
+
+def get_chunk_cache() -> TTLCache:
+    """LRU cache of resolved ``HoaxChunk``s by id (entries never expire)."""
+    global _chunk_cache
+    if _chunk_cache is None:
+        with _chunk_cache_lock:
+            if _chunk_cache is None:
+                _chunk_cache = TTLCache(
+                    max_entries=settings.PAYLOAD_CACHE_MAX_ENTRIES, ttl=float("inf")
+                )
+    return _chunk_cache
+
+
+def resolve_chunks(
+    ids: Sequence[str], fetch: Callable[[List[str]], Dict[str, Dict[str, Any]]]
+) -> Dict[str, HoaxChunk]:
+    """Chunks for ``ids`` from the LRU cache, the columnar store, then ``fetch``."""
+    cache = get_chunk_cache()
+    chunks: Dict[str, HoaxChunk] = {}
+    missing = []
+    for doc_id in dict.fromkeys(ids):
+        chunk = cache.get(doc_id)
+        if chunk is None:
+            missing.append(doc_id)
+        else:
+            chunks[doc_id] = chunk
+
+    fields: Dict[str, Dict[str, Any]] = {}
+    store = get_payload_store() if missing else None
+    if store is not None:
+        for doc_id in missing:
+            row = store.get(doc_id)
+            if row is not None:
+                fields[doc_id] = row
+    rest = [doc_id for doc_id in missing if doc_id not in fields]
+    if rest:
+        fields.update(fetch(rest))
+
+    for doc_id, row in fields.items():
+        chunk = HoaxChunk(**row)
+        cache.set(doc_id, chunk)
+        chunks[doc_id] = chunk
+    return chunks
@@ -0,0 +1,201 @@
+"""Token-budgeted prompt assembly.
+
+Retrieved chunks keep the order retrieval returned them in (the fused vector
+and BM25 ranking) and web results are ranked by score. Near-duplicates are
+dropped, each field is cut down to the sentences that overlap the query
+most, and items are added in that order while they fit the remaining token
+budget; an item that does not fit is skipped and later, shorter ones are
+still tried. Token counts are estimated from character length, which is
+close enough for budgeting and needs no tokenizer.
+"""
+import logging
+import re
+from typing import Iterable, List, NamedTuple, Optional, Set, Tuple
+from hoax_detect.config import settings
+from hoax_detect.models import HoaxChunk, NewsResult
+from hoax_detect.services.lexical import tokenize
+from hoax_detect.services.metrics import PROMPT_ITEMS, PROMPT_TOKENS
+
+CHARS_PER_TOKEN = 4
+DUPLICATE_JACCARD = 0.8
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+INSTRUCTIONS = (
+    "Based on the above information, determine if the user query is factual or a hoax. "
+    "Provide:\n"
+    "1. A clear verdict (HOAKS or FAKTA)\n"
+    "2. A detailed explanation in Indonesian\n"
+    "3. Sources used (if any)\n"
+    "4. References from the database (if any)\n"
+)
+
+
+class PromptStats(NamedTuple):
+    """Size of a built prompt and how many context items it kept."""
+
+    tokens: int
+    chars: int
+    chunks_used: int
+    chunks_dropped: int
+    web_used: int
+    web_dropped: int
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def trim_to_budget(text: str, query_terms: Set[str], max_tokens: int) -> str:
+    """Keep the sentences sharing most terms with the query, in original order.
+
+    Only the first ``4 * max_tokens`` tokens' worth of text are considered,
+    so the cost is bounded by the budget rather than the document length.
+    """
+    text = (text or "").strip()
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+
+    sentences = [s for s in _SENTENCE_END.split(text[: max_chars * 4]) if s.strip()]
+    overlap = [len(query_terms.intersection(tokenize(s))) for s in sentences]
+    ranked = sorted(range(len(sentences)), key=lambda i: (-overlap[i], i))
+    keep = []
+    used = 0
+    for i in ranked:
+        length = len(sentences[i]) + 1
+        if used + length > max_chars:
+            continue
+        keep.append(i)
+        used += length
+    if not keep:
+        return sentences[ranked[0]][:max_chars].rstrip() + "…"
+    return " ".join(sentences[i].strip() for i in sorted(keep))
+
+
+def _is_duplicate(terms: Set[str], seen: List[Set[str]]) -> bool:
+    for other in seen:
+        union = len(terms | other)
+        if union and len(terms & other) / union >= DUPLICATE_JACCARD:
+            return True
+    return False
+
+
+def _dedupe(items: Iterable, text_of) -> Tuple[list, int]:
+    """Drop items whose token set nearly matches an earlier (better) item."""
+    kept, seen, dropped = [], [], 0
+    for item in items:
+        terms = set(tokenize(text_of(item)))
+        if terms and _is_duplicate(terms, seen):
+            dropped += 1
+            continue
+        seen.append(terms)
+        kept.append(item)
+    return kept, dropped
+
+
+def _render_chunk(chunk: HoaxChunk, terms: Set[str], field_tokens: int) -> str:
+    return "\n".join(
+        [
+            "---",
+            f"Title: {chunk.title.strip()}",
+            f"Content: {trim_to_budget(chunk.content, terms, field_tokens)}",
+            f"Fact: {trim_to_budget(chunk.fact, terms, field_tokens)}",
+            f"Conclusion: {trim_to_budget(chunk.conclusion, terms, field_tokens // 2)}",
+            "References: "
+            + (trim_to_budget(chunk.references, set(), field_tokens // 2) or "None"),
+            "",
+        ]
+    )
+
+
+def _render_web(i: int, res: NewsResult, terms: Set[str], field_tokens: int) -> str:
+    return "\n".join(
+        [
+            f"Result {i}:",
+            f"Title: {res.title}",
+            f"URL: {res.url}",
+            f"Content: {trim_to_budget(res.content, terms, field_tokens)}",
+            f"Score: {res.score}",
+            "",
+        ]
+    )
+
+
+def build_prompt_with_stats(
+    user_query: str,
+    retrieved_chunks: List[HoaxChunk],
+    tavily_results: Optional[List[NewsResult]] = None,
+    token_budget: Optional[int] = None,
+    field_tokens: Optional[int] = None,
+) -> Tuple[str, PromptStats]:
+    """Build the prompt within ``token_budget`` and report its size."""
+    token_budget = token_budget or settings.PROMPT_TOKEN_BUDGET
+    field_tokens = field_tokens or settings.PROMPT_FIELD_TOKENS
+    terms = set(tokenize(user_query))
+
+    head = f"User Query:\n{user_query}\n\nRetrieved Context:\n"
+    remaining = token_budget - estimate_tokens(head + INSTRUCTIONS)
+
+    chunks, chunks_dropped = _dedupe(retrieved_chunks, lambda c: f"{c.title} {c.fact}")
+    web, web_dropped = _dedupe(
+        sorted(tavily_results or [], key=lambda r: -r.score),
+        lambda r: f"{r.title} {r.content}",
+    )
+
+    # Database hits first: they are curated fact checks.
+    sections = ["Database Results:\n"]
+    used_chunks = 0
+    for chunk in chunks:
+        block = _render_chunk(chunk, terms, field_tokens)
+        cost = estimate_tokens(block)
+        if cost > remaining:
+            continue  # a later, shorter item may still fit
+        sections.append(block)
+        remaining -= cost
+        used_chunks += 1
+
+    used_web = 0
+    if web:
+        header = "\nWeb Search Results:"
+        remaining -= estimate_tokens(header)
+        web_blocks = []
+        for res in web:
+            block = _render_web(used_web + 1, res, terms, field_tokens)
+            cost = estimate_tokens(block)
+            if cost > remaining:
+                continue
+            web_blocks.append(block)
+            remaining -= cost
+            used_web += 1
+        if web_blocks:
+            sections.append(header)
+            sections.extend(web_blocks)
+
+    prompt = "".join([head, "\n".join(sections), "\n", INSTRUCTIONS])
+    stats = PromptStats(
+        tokens=estimate_tokens(prompt),
+        chars=len(prompt),
+        chunks_used=used_chunks,
+        chunks_dropped=len(retrieved_chunks) - used_chunks,
+        web_used=used_web,
+        web_dropped=len(tavily_results or []) - used_web,
+    )
+    PROMPT_TOKENS.observe(stats.tokens)
+    PROMPT_ITEMS.inc(used_chunks, source="database", result="used")
+    PROMPT_ITEMS.inc(chunks_dropped, source="database", result="duplicate")
+    PROMPT_ITEMS.inc(len(chunks) - used_chunks, source="database", result="over_budget")
+    PROMPT_ITEMS.inc(used_web, source="web", result="used")
+    PROMPT_ITEMS.inc(web_dropped, source="web", result="duplicate")
+    PROMPT_ITEMS.inc(len(web) - used_web, source="web", result="over_budget")
+    logging.debug("Built prompt: %s", stats._asdict())
+    return prompt, stats
+
+
+def build_prompt(
+    user_query: str,
+    retrieved_chunks: List[HoaxChunk],
+    tavily_results: List[NewsResult] = None,
+) -> str:
+    """Build a prompt for the LLM using the user query and retrieved context."""
+    return build_prompt_with_stats(user_query, retrieved_chunks, tavily_results)[0]
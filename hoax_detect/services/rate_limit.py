@@ -0,0 +1,42 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Async token bucket allowing ``rate`` acquisitions per second.
+
+    Up to ``capacity`` tokens can be spent in a burst. A ``rate`` of 0 or less
+    disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def split(self, parts: int) -> None:
+        """Keep ``1/parts`` of the limit, for one of ``parts`` processes."""
+        if self.rate <= 0 or parts <= 1:
+            return
+        self.rate /= parts
+        self.capacity = max(1.0, self.capacity / parts)
+        self._tokens = min(self._tokens, self.capacity)
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, TypeVar
+from hoax_detect.services.metrics import COALESCED_REQUESTS
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls that share a key into one computation.
+
+    The first caller for a key starts ``fn`` as its own task; callers arriving
+    while it runs wait on that task instead of starting another, and all of
+    them get its result or its exception. A caller that is cancelled (e.g.
+    its client disconnected) stops waiting without cancelling the others; the
+    computation is cancelled only once every caller has gone. Keys are
+    forgotten as soon as the computation finishes, so this never serves stale
+    results; caching is left to the response caches.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call[T]] = {}
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._forget(key, call))
+        else:
+            self.coalesced += 1
+            COALESCED_REQUESTS.inc(endpoint=self.name)
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # The last interested caller is gone: stop the work, and make
+                # sure a new caller starts afresh instead of joining it.
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: str, call: _Call[T]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if call.task.done() and not call.task.cancelled():
+            call.task.exception()  # mark retrieved; every waiter may have left
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "coalesced": self.coalesced}
@@ -0,0 +1,42 @@
+"""Small helpers shared by the services.
+
+``cached_by_mtime`` backs the getters of the artifacts built offline (BM25
+index, payload store, classifier, trusted domains): each is loaded once and
+reloaded only when its file changes, so rebuilding one takes effect without a
+restart. ``l2_normalize`` is the one place vectors are scaled to unit length
+for cosine similarity.
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+import numpy as np
+
+T = TypeVar("T")
+
+_by_mtime: Dict[Tuple[str, Callable], Tuple[float, Any]] = {}
+_by_mtime_lock = threading.Lock()
+
+
+def cached_by_mtime(path: str, loader: Callable[[str], T]) -> Optional[T]:
+    """``loader(path)``, reused until the file's mtime changes.
+
+    Returns None when the file does not exist.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    key = (path, loader)
+    with _by_mtime_lock:
+        cached = _by_mtime.get(key)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, loader(path))
+            _by_mtime[key] = cached
+        return cached[1]
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale each vector (along the last axis) to unit length, as float32."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
@@ -1,148 +1,1030 @@
-from typing import List
-from pymilvus import (
-    Collection,
-    FieldSchema,
-    CollectionSchema,
-    DataType,
-    connections,
-    utility,
+import json
+import logging
+import os
+import threading
+import numpy as np
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Iterable,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
 )
 from hoax_detect.config import settings
 from hoax_detect.models import HoaxChunk
-from hoax_detect.services.embedding import embed_text
+from hoax_detect.services.embedding import embed_batch, embed_text
+from hoax_detect.services.metrics import span
+from hoax_detect.services.lexical import (
+    BM25Index,
+    get_lexical_index,
+    reciprocal_rank_fusion,
+)
+from hoax_detect.services.payload_store import PAYLOAD_FIELDS, resolve_chunks
+from hoax_detect.services.utils import l2_normalize
 from tqdm import tqdm
 
+if TYPE_CHECKING:
+    from pymilvus import Collection
+
 SIMILARITY_THRESHOLD = 0.3
+OUTPUT_FIELDS = [
+    "title",
+    "text",
+    "content",
+    "fact",
+    "conclusion",
+    "references",
+    "status",
+]
+ID_MAX_LENGTH = 64
+DELETE_BATCH_SIZE = 512
 
+INDEX_TYPES = ("FLAT", "IVF_FLAT", "IVF_SQ8", "HNSW")
+DEFAULT_INDEX_PARAMS: Dict[str, Dict[str, int]] = {
+    "FLAT": {},
+    "IVF_FLAT": {"nlist": 128},
+    "IVF_SQ8": {"nlist": 128},
+    "HNSW": {"M": 16, "efConstruction": 200},
+}
+DEFAULT_SEARCH_PARAMS: Dict[str, Dict[str, int]] = {
+    "FLAT": {},
+    "IVF_FLAT": {"nprobe": 16},
+    "IVF_SQ8": {"nprobe": 16},
+    "HNSW": {"ef": 64},
+}
 
-def connect_milvus():
-    """Connect to Milvus vector database."""
-    connections.connect(
-        alias="default",
-        host=settings.MILVUS_HOST,
-        port=settings.MILVUS_PORT,
-        token=settings.MILVUS_TOKEN,
+T = TypeVar("T")
+
+
+class SearchHit(NamedTuple):
+    """A single search result independent of the backend."""
+
+    id: Any
+    score: float
+    fields: Dict[str, Any]
+
+
+class IndexConfig(NamedTuple):
+    """ANN index type with its build and search parameters."""
+
+    index_type: str
+    index_params: Dict[str, Any]
+    search_params: Dict[str, Any]
+
+
+def load_tuning(store_name: str) -> Optional[Dict[str, Any]]:
+    """The saved ``tune_index`` result for ``store_name``, if there is one."""
+    path = settings.INDEX_TUNING_PATH
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        tuning = json.load(f)
+    return tuning if tuning.get("store") == store_name else None
+
+
+def index_config(store_name: str) -> IndexConfig:
+    """The tuned index for ``store_name``, else the ``MILVUS_INDEX_*`` settings."""
+    tuning = load_tuning(store_name)
+    if tuning is not None:
+        return IndexConfig(
+            tuning["index_type"], tuning["index_params"], tuning["search_params"]
+        )
+    index_type = settings.MILVUS_INDEX_TYPE.upper()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown MILVUS_INDEX_TYPE: {index_type}")
+    return IndexConfig(
+        index_type,
+        {
+            **DEFAULT_INDEX_PARAMS[index_type],
+            **json.loads(settings.MILVUS_INDEX_PARAMS or "{}"),
+        },
+        {
+            **DEFAULT_SEARCH_PARAMS[index_type],
+            **json.loads(settings.MILVUS_SEARCH_PARAMS or "{}"),
+        },
     )
 
 
-def create_collection() -> Collection:
-    """Create or return existing Milvus collection."""
-    connect_milvus()
-
-    if utility.has_collection(settings.MILVUS_COLLECTION):
-        return Collection(settings.MILVUS_COLLECTION)
-
-    fields = [
-        FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
-        FieldSchema(name="title", dtype=DataType.VARCHAR, max_length=512),
-        FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=10240),
-        FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=5000),
-        FieldSchema(name="fact", dtype=DataType.VARCHAR, max_length=5000),
-        FieldSchema(name="conclusion", dtype=DataType.VARCHAR, max_length=5000),
-        FieldSchema(name="references", dtype=DataType.VARCHAR, max_length=2048),
-        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=768),
-    ]
+class VectorStore(ABC):
+    """Interface shared by the Milvus and local vector store backends.
+
+    Entities are column-ordered lists: the content-hash ids, the columns of
+    ``OUTPUT_FIELDS`` in order, then the embeddings.
+    """
+
+    name: str = "vector_store"
+
+    @abstractmethod
+    def insert(self, entities: List[List], flush: bool = False) -> int:
+        """Insert column-ordered entities, optionally flushing afterwards."""
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Persist pending inserts and make them searchable."""
+
+    @abstractmethod
+    def search(
+        self, embeddings: List, top_k: int = 5, output_fields: Optional[List[str]] = None
+    ) -> List[List[SearchHit]]:
+        """Return the ``top_k`` cosine hits for each query embedding."""
+
+    @abstractmethod
+    def fetch(
+        self, ids: Sequence[str], output_fields: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Return the stored fields of the given ids, keyed by id."""
+
+    @abstractmethod
+    def export_vectors(self) -> Tuple[List[str], np.ndarray]:
+        """All ids with their embeddings, in matching order."""
+
+    @abstractmethod
+    def list_ids(self) -> Set[str]:
+        """Return the ids of every stored row."""
+
+    @abstractmethod
+    def delete(self, ids: Iterable[str]) -> int:
+        """Delete rows by id and return how many were requested."""
+
+    @abstractmethod
+    def drop(self) -> None:
+        """Remove all stored data."""
+
+    def warm_up(self) -> None:
+        """Prepare the backend so the first search is fast."""
+
+    def reload(self) -> None:
+        """Re-read index state and settings held in this process."""
+
+    @abstractmethod
+    def rebuild_index(self, config: IndexConfig) -> None:
+        """Rebuild the ANN index over the stored vectors with ``config``."""
+
+    @abstractmethod
+    def health(self) -> Dict[str, Any]:
+        """Probe the backend; raises if it cannot serve searches."""
+
+
+class MilvusVectorStore(VectorStore):
+    """Long-lived Milvus client that keeps one loaded collection handle.
+
+    The connection is opened once and the collection is created and loaded on
+    first use. Calls that fail because the connection dropped are retried once
+    after reconnecting. New collections are indexed with ``index_config``;
+    searches use its search parameters as long as the collection's live index
+    is of the same type.
+    """
+
+    def __init__(
+        self,
+        collection_name: Optional[str] = None,
+        alias: str = "default",
+        config: Optional[IndexConfig] = None,
+    ):
+        self.collection_name = collection_name or settings.MILVUS_COLLECTION
+        self.name = f"milvus:{self.collection_name}"
+        self.alias = alias
+        self._fixed_config = config is not None
+        self.index_config = config or index_config(self.name)
+        self._collection: Optional["Collection"] = None
+        self._loaded = False
+        self._index_type: Optional[str] = None
+        self._lock = threading.RLock()
+
+    def connect(self) -> None:
+        """Open the Milvus connection if it is not already open."""
+        from pymilvus import connections
+
+        with self._lock:
+            if connections.has_connection(self.alias):
+                return
+            connections.connect(
+                alias=self.alias,
+                host=settings.MILVUS_HOST,
+                port=settings.MILVUS_PORT,
+                token=settings.MILVUS_TOKEN,
+            )
+
+    def reconnect(self) -> None:
+        """Drop the cached connection and collection handle and connect again."""
+        from pymilvus import connections
+
+        with self._lock:
+            try:
+                connections.disconnect(self.alias)
+            except Exception:
+                pass
+            self._collection = None
+            self._loaded = False
+            self._index_type = None
+            self.connect()
+
+    @property
+    def collection(self) -> "Collection":
+        """Return the collection handle, creating the collection if needed."""
+        with self._lock:
+            if self._collection is None:
+                self.connect()
+                self._collection = self._create_or_get_collection()
+            return self._collection
+
+    def loaded_collection(self) -> "Collection":
+        """Return the collection handle after loading it into memory once."""
+        collection = self.collection
+        with self._lock:
+            if not self._loaded:
+                collection.load()
+                self._index_type = _live_index_type(collection)
+                self._loaded = True
+                if self._index_type not in (None, self.index_config.index_type):
+                    logging.warning(
+                        "Collection %s has a %s index but %s is configured; "
+                        "searching with the %s defaults until the index is rebuilt",
+                        self.collection_name,
+                        self._index_type,
+                        self.index_config.index_type,
+                        self._index_type,
+                    )
+        return collection
+
+    def _search_params(self) -> Dict[str, Any]:
+        live = self._index_type
+        if live and live != self.index_config.index_type:
+            params = DEFAULT_SEARCH_PARAMS.get(live, {})
+        else:
+            params = self.index_config.search_params
+        return {"metric_type": "COSINE", "params": params}
+
+    def _create_or_get_collection(self) -> "Collection":
+        from pymilvus import (
+            Collection,
+            CollectionSchema,
+            DataType,
+            FieldSchema,
+            utility,
+        )
+
+        if utility.has_collection(self.collection_name, using=self.alias):
+            collection = Collection(self.collection_name, using=self.alias)
+            if collection.schema.primary_field.dtype != DataType.VARCHAR:
+                raise RuntimeError(
+                    f"Collection {self.collection_name} uses the old auto-id schema; "
+                    "re-run the loader with --clear to rebuild it"
+                )
+            if "status" not in {field.name for field in collection.schema.fields}:
+                raise RuntimeError(
+                    f"Collection {self.collection_name} has no status field; "
+                    "re-run the loader with --clear to rebuild it"
+                )
+            return collection
+
+        fields = [
+            FieldSchema(
+                name="id",
+                dtype=DataType.VARCHAR,
+                max_length=ID_MAX_LENGTH,
+                is_primary=True,
+                auto_id=False,
+            ),
+            FieldSchema(name="title", dtype=DataType.VARCHAR, max_length=512),
+            FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=10240),
+            FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=5000),
+            FieldSchema(name="fact", dtype=DataType.VARCHAR, max_length=5000),
+            FieldSchema(name="conclusion", dtype=DataType.VARCHAR, max_length=5000),
+            FieldSchema(name="references", dtype=DataType.VARCHAR, max_length=2048),
+            FieldSchema(name="status", dtype=DataType.VARCHAR, max_length=64),
+            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=768),
+        ]
+
+        schema = CollectionSchema(fields, description="Hoax news embeddings")
+        collection = Collection(self.collection_name, schema, using=self.alias)
+
+        collection.create_index("embedding", _milvus_index(self.index_config))
+
+        return collection
+
+    def _call(self, fn: Callable[[], T]) -> T:
+        """Run ``fn`` and retry it once after reconnecting on connection loss."""
+        from pymilvus.exceptions import (
+            ConnectionNotExistException,
+            MilvusUnavailableException,
+        )
+
+        try:
+            return fn()
+        except (ConnectionNotExistException, MilvusUnavailableException) as e:
+            logging.warning("Milvus connection lost (%s), reconnecting", e)
+            self.reconnect()
+            return fn()
+
+    def insert(self, entities: List[List], flush: bool = False) -> int:
+        """Insert column-ordered entities, optionally flushing afterwards."""
+        result = self._call(lambda: self.collection.insert(entities))
+        if flush:
+            self.flush()
+        return len(result.primary_keys)
+
+    def flush(self) -> None:
+        """Seal pending inserts so they are persisted and searchable."""
+        self._call(lambda: self.collection.flush())
+
+    def search(
+        self, embeddings: List, top_k: int = 5, output_fields: Optional[List[str]] = None
+    ) -> List[List[SearchHit]]:
+        """Run an ANN search for one or more query embeddings."""
+        output_fields = OUTPUT_FIELDS if output_fields is None else output_fields
+
+        def run():
+            collection = self.loaded_collection()
+            return collection.search(
+                data=embeddings,
+                anns_field="embedding",
+                param=self._search_params(),
+                limit=top_k,
+                output_fields=output_fields,
+            )
+
+        results = self._call(run)
+        return [
+            [
+                SearchHit(
+                    id=hit.id,
+                    score=hit.score,
+                    fields={field: hit.entity.get(field) for field in output_fields},
+                )
+                for hit in hits
+            ]
+            for hits in results
+        ]
+
+    def fetch(
+        self, ids: Sequence[str], output_fields: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Look rows up by primary key."""
+        output_fields = OUTPUT_FIELDS if output_fields is None else output_fields
+        if not ids:
+            return {}
+        rows = self._call(
+            lambda: self.loaded_collection().query(
+                expr=f"id in {json.dumps(list(ids))}",
+                output_fields=["id"] + output_fields,
+            )
+        )
+        return {row["id"]: {f: row.get(f) for f in output_fields} for row in rows}
+
+    def export_vectors(self) -> Tuple[List[str], np.ndarray]:
+        """Page through the collection and collect ids with their embeddings."""
+
+        def collect() -> Tuple[List[str], np.ndarray]:
+            ids: List[str] = []
+            vectors: List[List[float]] = []
+            iterator = self.collection.query_iterator(
+                batch_size=1000, expr='id != ""', output_fields=["id", "embedding"]
+            )
+            try:
+                while True:
+                    page = iterator.next()
+                    if not page:
+                        break
+                    for row in page:
+                        ids.append(row["id"])
+                        vectors.append(row["embedding"])
+            finally:
+                iterator.close()
+            return ids, np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+
+        return self._call(collect)
+
+    def list_ids(self) -> Set[str]:
+        """Page through the collection and collect every primary key."""
+
+        def collect() -> Set[str]:
+            ids: Set[str] = set()
+            iterator = self.collection.query_iterator(
+                batch_size=1000, expr='id != ""', output_fields=["id"]
+            )
+            try:
+                while True:
+                    page = iterator.next()
+                    if not page:
+                        return ids
+                    ids.update(row["id"] for row in page)
+            finally:
+                iterator.close()
+
+        return self._call(collect)
+
+    def delete(self, ids: Iterable[str]) -> int:
+        """Delete rows by primary key in batches."""
+        ids = list(ids)
+        for i in range(0, len(ids), DELETE_BATCH_SIZE):
+            expr = f"id in {json.dumps(ids[i : i + DELETE_BATCH_SIZE])}"
+            self._call(lambda: self.collection.delete(expr))
+        return len(ids)
+
+    def drop(self) -> None:
+        """Drop the collection and forget the cached handle."""
+        self._call(lambda: self.collection.drop())
+        with self._lock:
+            self._collection = None
+            self._loaded = False
+            self._index_type = None
+
+    def rebuild_index(self, config: IndexConfig) -> None:
+        """Replace the embedding index; searches fail until it is loaded again."""
+
+        def rebuild() -> None:
+            collection = self.collection
+            collection.release()
+            collection.drop_index()
+            collection.create_index("embedding", _milvus_index(config))
+            collection.load()
+
+        with self._lock:
+            self._call(rebuild)
+            self.index_config = config
+            self._index_type = config.index_type
+            self._loaded = True
+
+    def reload(self) -> None:
+        """Re-read the index settings and the saved tuning result."""
+        with self._lock:
+            if not self._fixed_config:
+                self.index_config = index_config(self.name)
+            # Detect the live index type again on the next search, in case
+            # another process rebuilt it.
+            self._loaded = False
+
+    def warm_up(self) -> None:
+        """Connect and load the collection so the first search is fast."""
+        self._call(self.loaded_collection)
+
+    def health(self) -> Dict[str, Any]:
+        """Round-trip to the server and report the collection's state."""
+        from pymilvus import utility
+
+        def probe() -> Dict[str, Any]:
+            self.connect()
+            version = utility.get_server_version(using=self.alias)
+            return {
+                "server_version": version,
+                "collection": self.collection_name,
+                "loaded": self._loaded,
+                "index_type": self._index_type,
+                "search_params": self._search_params()["params"],
+                "entities": self.collection.num_entities,
+            }
+
+        return self._call(probe)
 
-    schema = CollectionSchema(fields, description="Hoax news embeddings")
-    collection = Collection(settings.MILVUS_COLLECTION, schema)
 
-    index_params = {
+class LocalVectorStore(VectorStore):
+    """In-process vector index backed by memory-mapped NumPy files.
+
+    Embeddings are L2-normalised and stored as a float32 matrix in
+    ``embeddings.npy`` so cosine similarity is a dot product. Search is exact
+    unless ``nlist`` is set, in which case an IVF partitioning (spherical
+    k-means) restricts each query to the ``nprobe`` closest lists. Unless
+    given explicitly, ``nlist`` and ``nprobe`` come from the saved tuning
+    result for this index (FLAT or IVF_FLAT), else from ``LOCAL_IVF_*``.
+    """
+
+    INDEX_TYPES = ("FLAT", "IVF_FLAT")
+
+    EMBEDDINGS_FILE = "embeddings.npy"
+    RECORDS_FILE = "records.jsonl"
+    CENTROIDS_FILE = "ivf_centroids.npy"
+    ASSIGNMENTS_FILE = "ivf_assignments.npy"
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        nlist: Optional[int] = None,
+        nprobe: Optional[int] = None,
+    ):
+        self.path = Path(path or settings.LOCAL_INDEX_PATH)
+        self.name = f"local:{self.path}"
+        self._explicit = (nlist, nprobe)
+        self._configure()
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._embeddings: Optional[np.ndarray] = None
+        self._records: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._pending_records: List[Dict[str, Any]] = []
+        self._pending_embeddings: List[np.ndarray] = []
+
+    def _configure(self) -> None:
+        nlist, nprobe = self._explicit
+        default_nlist = settings.LOCAL_IVF_NLIST
+        default_nprobe = settings.LOCAL_IVF_NPROBE
+        tuning = load_tuning(self.name)
+        if tuning is not None and tuning["index_type"] in self.INDEX_TYPES:
+            default_nlist = tuning["index_params"].get("nlist", 0)
+            default_nprobe = tuning["search_params"].get("nprobe", default_nprobe)
+        self.nlist = default_nlist if nlist is None else nlist
+        self.nprobe = default_nprobe if nprobe is None else nprobe
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            embeddings_path = self.path / self.EMBEDDINGS_FILE
+            if embeddings_path.exists():
+                self._embeddings = np.load(embeddings_path, mmap_mode="r")
+                with open(self.path / self.RECORDS_FILE, "r") as f:
+                    self._records = [json.loads(line) for line in f]
+                self._rows = {r["id"]: i for i, r in enumerate(self._records)}
+            centroids_path = self.path / self.CENTROIDS_FILE
+            if self.nlist and centroids_path.exists():
+                self._centroids = np.load(centroids_path)
+                assignments = np.load(self.path / self.ASSIGNMENTS_FILE)
+                self._lists = _inverted_lists(assignments, len(self._centroids))
+                if len(self._centroids) != min(self.nlist, len(assignments)):
+                    logging.warning(
+                        "Local index at %s has %d IVF lists, %d configured; "
+                        "rebuild it to apply",
+                        self.path,
+                        len(self._centroids),
+                        self.nlist,
+                    )
+            self._loaded = True
+
+    def insert(self, entities: List[List], flush: bool = False) -> int:
+        """Queue column-ordered entities; they are written on ``flush``."""
+        *columns, embeddings = entities
+        fields = ["id"] + OUTPUT_FIELDS
+        records = [dict(zip(fields, values)) for values in zip(*columns)]
+        with self._lock:
+            self._pending_records.extend(records)
+            self._pending_embeddings.append(
+                l2_normalize(np.asarray(embeddings, dtype=np.float32))
+            )
+        if flush:
+            self.flush()
+        return len(records)
+
+    def flush(self) -> None:
+        """Append pending rows to disk, retrain IVF lists and remap the matrix."""
+        with self._lock:
+            if not self._pending_records:
+                return
+            self._load()
+
+            parts = list(self._pending_embeddings)
+            if self._embeddings is not None and len(self._embeddings):
+                parts.insert(0, np.asarray(self._embeddings))
+            self._write(np.vstack(parts), self._records + self._pending_records)
+
+    def fetch(
+        self, ids: Sequence[str], output_fields: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Look rows up through the id -> row map."""
+        self._load()
+        output_fields = OUTPUT_FIELDS if output_fields is None else output_fields
+        found = {}
+        for record_id in ids:
+            row = self._rows.get(record_id)
+            if row is not None:
+                record = self._records[row]
+                found[record_id] = {f: record.get(f) for f in output_fields}
+        return found
+
+    def export_vectors(self) -> Tuple[List[str], np.ndarray]:
+        """Ids with their normalised embeddings (pending rows are not included)."""
+        self._load()
+        with self._lock:
+            if self._embeddings is None:
+                return [], np.zeros((0, 0), dtype=np.float32)
+            return [r["id"] for r in self._records], np.asarray(self._embeddings)
+
+    def list_ids(self) -> Set[str]:
+        self._load()
+        with self._lock:
+            return {record["id"] for record in self._records + self._pending_records}
+
+    def delete(self, ids: Iterable[str]) -> int:
+        """Remove rows by id and rewrite the index files."""
+        ids = set(ids)
+        if not ids:
+            return 0
+        with self._lock:
+            self.flush()
+            self._load()
+            if self._embeddings is None:
+                return len(ids)
+            keep = [i for i, r in enumerate(self._records) if r["id"] not in ids]
+            matrix = np.asarray(self._embeddings)[keep]
+            self._write(matrix, [self._records[i] for i in keep])
+        return len(ids)
+
+    def _write(self, matrix: np.ndarray, records: List[Dict[str, Any]]) -> None:
+        """Atomically replace the index files and remap them."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        matrix = matrix.astype(np.float32).reshape(len(records), -1)
+
+        records_tmp = self.path / (self.RECORDS_FILE + ".tmp")
+        with open(records_tmp, "w") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        _atomic_save(self.path / self.EMBEDDINGS_FILE, matrix)
+        os.replace(records_tmp, self.path / self.RECORDS_FILE)
+
+        if self.nlist and len(matrix):
+            centroids, assignments = _train_ivf(matrix, self.nlist)
+            _atomic_save(self.path / self.CENTROIDS_FILE, centroids)
+            _atomic_save(self.path / self.ASSIGNMENTS_FILE, assignments)
+        else:
+            (self.path / self.CENTROIDS_FILE).unlink(missing_ok=True)
+            (self.path / self.ASSIGNMENTS_FILE).unlink(missing_ok=True)
+
+        self._pending_records = []
+        self._pending_embeddings = []
+        self._remap()
+
+    def rebuild_index(self, config: IndexConfig) -> None:
+        """Retrain (or remove) the IVF lists for ``config`` and remap."""
+        if config.index_type not in self.INDEX_TYPES:
+            raise ValueError(
+                f"The local store supports {', '.join(self.INDEX_TYPES)}, "
+                f"not {config.index_type}"
+            )
+        with self._lock:
+            self.flush()
+            self._load()
+            self.nlist = config.index_params.get("nlist", 0)
+            self.nprobe = config.search_params.get("nprobe", self.nprobe)
+            if self._embeddings is not None:
+                self._write(np.asarray(self._embeddings), list(self._records))
+
+    def reload(self) -> None:
+        """Re-read the tuning result, then map the files on disk again."""
+        with self._lock:
+            self._configure()
+            self._remap()
+
+    def _remap(self) -> None:
+        with self._lock:
+            self._records = []
+            self._rows = {}
+            self._embeddings = None
+            self._centroids = None
+            self._lists = []
+            self._loaded = False
+            self._load()
+
+    def search(
+        self, embeddings: List, top_k: int = 5, output_fields: Optional[List[str]] = None
+    ) -> List[List[SearchHit]]:
+        """Exact (or IVF-restricted) cosine top-k over the local matrix."""
+        self._load()
+        output_fields = OUTPUT_FIELDS if output_fields is None else output_fields
+        queries = l2_normalize(
+            np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+        )
+        matrix = self._embeddings
+        if matrix is None or not len(matrix):
+            return [[] for _ in range(len(queries))]
+
+        results = []
+        for query in queries:
+            if self._centroids is not None:
+                probes = np.argsort(self._centroids @ query)[::-1][: self.nprobe]
+                candidates = np.concatenate([self._lists[p] for p in probes])
+            else:
+                candidates = None
+            rows, scores = _top_k(matrix, query, top_k, candidates)
+            results.append(
+                [
+                    SearchHit(
+                        id=self._records[row]["id"],
+                        score=float(score),
+                        fields={f: self._records[row].get(f) for f in output_fields},
+                    )
+                    for row, score in zip(rows, scores)
+                ]
+            )
+        return results
+
+    def drop(self) -> None:
+        """Delete the index files and any pending rows."""
+        with self._lock:
+            for name in (
+                self.EMBEDDINGS_FILE,
+                self.RECORDS_FILE,
+                self.CENTROIDS_FILE,
+                self.ASSIGNMENTS_FILE,
+            ):
+                (self.path / name).unlink(missing_ok=True)
+            self._embeddings = None
+            self._records = []
+            self._rows = {}
+            self._centroids = None
+            self._lists = []
+            self._pending_records = []
+            self._pending_embeddings = []
+            self._loaded = False
+
+    def health(self) -> Dict[str, Any]:
+        """Report whether the index files are present and mapped."""
+        self._load()
+        if self._embeddings is None:
+            raise RuntimeError(f"No local index at {self.path}")
+        return {
+            "path": str(self.path),
+            "entities": len(self._records),
+            "ivf_lists": len(self._lists),
+            "nprobe": self.nprobe if self._lists else None,
+        }
+
+    def warm_up(self) -> None:
+        """Map the index files and touch the matrix pages."""
+        self._load()
+        if self._embeddings is not None:
+            float(np.asarray(self._embeddings).sum())
+
+
+def _top_k(
+    matrix: np.ndarray,
+    query: np.ndarray,
+    k: int,
+    candidates: Optional[np.ndarray] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return row ids and scores of the ``k`` best rows, best first."""
+    if candidates is None:
+        scores = matrix @ query
+        rows = np.arange(len(scores))
+    else:
+        rows = np.sort(candidates)
+        scores = matrix[rows] @ query
+    k = min(k, len(scores))
+    if k == 0:
+        return rows[:0], scores[:0]
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best])]
+    return rows[best], scores[best]
+
+
+def _train_ivf(
+    matrix: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means over normalised rows; returns centroids and assignments."""
+    nlist = max(1, min(nlist, len(matrix)))
+    rng = np.random.default_rng(seed)
+    centroids = matrix[rng.choice(len(matrix), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(matrix @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = matrix[assignments == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+            else:
+                centroids[c] = matrix[rng.integers(len(matrix))]
+        centroids = l2_normalize(centroids)
+    assignments = np.argmax(matrix @ centroids.T, axis=1)
+    return centroids.astype(np.float32), assignments.astype(np.int64)
+
+
+def _inverted_lists(assignments: np.ndarray, nlist: int) -> List[np.ndarray]:
+    order = np.argsort(assignments, kind="stable")
+    bounds = np.searchsorted(assignments[order], np.arange(nlist + 1))
+    return [order[bounds[c] : bounds[c + 1]] for c in range(nlist)]
+
+
+def _milvus_index(config: IndexConfig) -> Dict[str, Any]:
+    return {
         "metric_type": "COSINE",
-        "index_type": "IVF_FLAT",
-        "params": {"nlist": 128},
+        "index_type": config.index_type,
+        "params": config.index_params,
     }
-    collection.create_index("embedding", index_params)
 
-    return collection
+
+def _live_index_type(collection: "Collection") -> Optional[str]:
+    """Type of the index built on the collection's embedding field."""
+    for index in collection.indexes:
+        if index.field_name == "embedding":
+            return index.params.get("index_type")
+    return None
+
+
+def _atomic_save(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+_store: Optional[VectorStore] = None
+_store_lock = threading.Lock()
 
 
-def insert_data(entities: List[List]) -> int:
+def get_vector_store() -> VectorStore:
+    """Return the process-wide vector store for ``VECTOR_STORE_BACKEND``."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = settings.VECTOR_STORE_BACKEND.lower()
+                if backend == "milvus":
+                    _store = MilvusVectorStore()
+                elif backend == "local":
+                    _store = LocalVectorStore()
+                else:
+                    raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {backend}")
+    return _store
+
+
+def _milvus_store() -> MilvusVectorStore:
+    store = get_vector_store()
+    if not isinstance(store, MilvusVectorStore):
+        raise RuntimeError("VECTOR_STORE_BACKEND is not set to 'milvus'")
+    return store
+
+
+def connect_milvus():
+    """Connect to Milvus vector database."""
+    _milvus_store().connect()
+
+
+def create_collection() -> "Collection":
+    """Create or return existing Milvus collection."""
+    return _milvus_store().collection
+
+
+def insert_data(entities: List[List], flush: bool = True) -> int:
     """Insert data into Milvus collection.
 
     Args:
         entities: List of entity lists in format:
             [
+                [ids],
                 [titles],
                 [texts],
                 [contents],
                 [facts],
                 [conclusions],
                 [references],
+                [statuses],
                 [embeddings]
             ]
+        flush: Flush the collection after inserting
 
     Returns:
         Number of inserted entities
     """
-    collection = create_collection()
-    insert_result = collection.insert(entities)
-    collection.flush()
-    return len(insert_result.primary_keys)
+    return get_vector_store().insert(entities, flush=flush)
+
+
+def frame_entities(df, embeddings: np.ndarray) -> List[List]:
+    """Column-ordered entities for a cleaned dataframe and its embeddings."""
+    return [
+        df.id.tolist(),
+        df.title.tolist(),
+        df.text.tolist(),
+        df.content.tolist(),
+        df.fact.tolist(),
+        df.conclusion.tolist(),
+        df.references.tolist(),
+        df.status.tolist(),
+        list(embeddings),
+    ]
 
 
 def batch_insert_data(df, batch_size: int = 32) -> int:
     """Batch insert dataframe into Milvus with progress tracking.
 
+    The collection is flushed once after all batches have been inserted.
+
     Args:
-        df: DataFrame containing columns: title, text, content, fact, conclusion, references
+        df: DataFrame containing columns: id, title, text, content, fact, conclusion,
+            references, status
         batch_size: Number of records per batch
 
     Returns:
         Total number of inserted records
     """
+    store = get_vector_store()
+    embeddings = embed_batch(df.text.tolist(), batch_size=batch_size)
+
     total_inserted = 0
     for i in tqdm(range(0, len(df), batch_size), desc="Inserting data"):
         batch = df.iloc[i : i + batch_size]
-        entities = [
-            batch.title.tolist(),
-            batch.text.tolist(),
-            batch.content.tolist(),
-            batch.fact.tolist(),
-            batch.conclusion.tolist(),
-            batch.references.tolist(),
-            [embed_text(row.text) for _, row in batch.iterrows()],
-        ]
-        total_inserted += insert_data(entities)
+        total_inserted += store.insert(
+            frame_entities(batch, embeddings[i : i + batch_size])
+        )
+    store.flush()
     return total_inserted
 
 
 def search_similar_chunks(
-    query: str, top_k: int = 5, threshold: float = SIMILARITY_THRESHOLD
+    query: str,
+    top_k: int = 5,
+    threshold: float = SIMILARITY_THRESHOLD,
+    query_embedding: Optional[np.ndarray] = None,
 ) -> List[HoaxChunk]:
-    """Search for similar hoax chunks in vector database."""
-    from hoax_detect.services.embedding import embed_text
-
-    connect_milvus()
-    collection = Collection(settings.MILVUS_COLLECTION)
-    collection.load()
-
-    query_embedding = embed_text(query)
-    search_params = {"metric_type": "COSINE", "params": {"nprobe": 16}}
-
-    results = collection.search(
-        data=[query_embedding],
-        anns_field="embedding",
-        param=search_params,
-        limit=top_k,
-        output_fields=["title", "text", "content", "fact", "conclusion", "references"],
-    )
+    """Search for similar hoax chunks in vector database.
 
-    return [
-        HoaxChunk(
-            title=hit.entity.get("title"),
-            text=hit.entity.get("text"),
-            content=hit.entity.get("content"),
-            fact=hit.entity.get("fact"),
-            conclusion=hit.entity.get("conclusion"),
-            references=hit.entity.get("references"),
+    A precomputed ``query_embedding`` (e.g. from ``embed_batch``) skips
+    embedding the query again.
+    """
+    if query_embedding is None:
+        query_embedding = embed_text(query)
+
+    return search_similar_chunks_batch(
+        [query], [query_embedding], top_k=top_k, threshold=threshold
+    )[0]
+
+
+def search_similar_chunks_batch(
+    queries: List[str],
+    query_embeddings: Optional[Sequence[np.ndarray]] = None,
+    top_k: int = 5,
+    threshold: float = SIMILARITY_THRESHOLD,
+) -> List[List[HoaxChunk]]:
+    """Search for many queries with a single multi-vector call.
+
+    Returns one list of chunks per query, in input order. The vector search
+    returns ids and scores only; the fields of the hits that pass the
+    threshold (and of lexical-only hits) are resolved afterwards through the
+    payload cache and store.
+    """
+    if not queries:
+        return []
+    if query_embeddings is None:
+        query_embeddings = embed_batch(queries)
+
+    store = get_vector_store()
+    with span("vector_search"):
+        results = store.search(list(query_embeddings), top_k=top_k, output_fields=[])
+    results = [[hit for hit in hits if hit.score >= threshold] for hits in results]
+
+    index = get_lexical_index() if settings.HYBRID_SEARCH else None
+    if index is None:
+        ranked = [[(hit.id, hit.score) for hit in hits] for hits in results]
+    else:
+        with span("lexical_search"):
+            ranked = _fuse_lexical(index, queries, results, top_k)
+
+    with span("payload_fetch"):
+        chunks = resolve_chunks(
+            [doc_id for ids in ranked for doc_id, _ in ids],
+            lambda ids: store.fetch(ids, PAYLOAD_FIELDS),
         )
-        for hit in results[0]
-        if hit.score >= threshold
+    return [
+        [
+            chunks[doc_id].model_copy(update={"score": score})
+            for doc_id, score in ids
+            if doc_id in chunks
+        ]
+        for ids in ranked
     ]
 
 
+def _fuse_lexical(
+    index: BM25Index,
+    queries: List[str],
+    results: List[List[SearchHit]],
+    top_k: int,
+) -> List[List[Tuple[str, Optional[float]]]]:
+    """Merge vector hits with BM25 hits by reciprocal-rank fusion.
+
+    Returns ``(id, similarity)`` pairs per query; rows found only lexically
+    carry no similarity score.
+    """
+    fused_ids = []
+    for query, hits in zip(queries, results):
+        scores = {hit.id: hit.score for hit in hits}
+        lexical = [
+            doc_id
+            for doc_id, _ in index.search(
+                query, top_k, min_score=settings.LEXICAL_MIN_SCORE
+            )
+        ]
+        fused = reciprocal_rank_fusion(
+            [[hit.id for hit in hits], lexical], k=settings.RRF_K
+        )
+        fused_ids.append([(doc_id, scores.get(doc_id)) for doc_id, _ in fused[:top_k]])
+    return fused_ids
+
+
+def warm_up() -> None:
+    """Connect to Milvus and load the collection into memory."""
+    get_vector_store().warm_up()
+
+
 def clear_collection():
-    """Clear all data from the collection."""
-    collection = create_collection()
-    collection.drop()
-    return create_collection()
+    """Clear all data from the configured vector store."""
+    store = get_vector_store()
+    store.drop()
+    return store
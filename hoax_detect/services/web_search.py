@@ -1,29 +1,108 @@
+import hashlib
 import json
 import os
-import requests
-from pathlib import Path
-from typing import List
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from hoax_detect import TRUSTED_DOMAINS_PATH
+from hoax_detect.config import settings
 from hoax_detect.models import NewsResult
+from hoax_detect.services.cache import SQLiteCacheBackend, TTLCache, query_hash
+from hoax_detect.services.http import apost_json, post_json
+from hoax_detect.services.utils import cached_by_mtime
 
+SEARCH_TYPE = "news"
 
-def load_trusted_domains() -> List[str]:
-    """Load the list of trusted domains from JSON file."""
-    config_path = Path(__file__).parent.parent / "config" / "trusted_domains.json"
+
+class TrustedDomains:
+    """Trusted domain list with a suffix-match lookup.
+
+    Domains are normalised (lower-case, no ``www.``) and kept in a set, so
+    checking a host is one set lookup per label suffix: ``a.b.example.com``
+    matches a trusted ``example.com``.
+    """
+
+    def __init__(self, domains: List[str]):
+        self.domains = sorted({_normalize_host(d) for d in domains if d.strip()})
+        self._suffixes = frozenset(self.domains)
+        self.digest = hashlib.sha256("\n".join(self.domains).encode()).hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.domains)
+
+    def matches_host(self, host: str) -> bool:
+        labels = _normalize_host(host).split(".")
+        return any(
+            ".".join(labels[i:]) in self._suffixes for i in range(len(labels) - 1)
+        )
+
+    def matches_url(self, url: str) -> bool:
+        try:
+            host = urlsplit(url).hostname
+        except ValueError:
+            return False
+        return bool(host) and self.matches_host(host)
+
+
+def _normalize_host(host: str) -> str:
+    host = host.strip().lower().rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def _read_trusted_domains(path: str) -> TrustedDomains:
+    with open(path, "r") as f:
+        return TrustedDomains(json.load(f))
+
+
+def get_trusted_domains() -> TrustedDomains:
+    """The trusted domain set, re-read only when the JSON file changes."""
     try:
-        with open(config_path, "r") as f:
-            return json.load(f)
+        domains = cached_by_mtime(str(TRUSTED_DOMAINS_PATH), _read_trusted_domains)
     except Exception as e:
         raise RuntimeError(f"Error loading trusted domains: {e}")
+    if domains is None:
+        raise RuntimeError(f"Trusted domains file not found: {TRUSTED_DOMAINS_PATH}")
+    return domains
 
 
-def call_tavily_api(query: str, max_results: int = 3) -> List[NewsResult]:
-    """Call the Tavily API to search for news articles."""
+def load_trusted_domains() -> List[str]:
+    """Load the list of trusted domains from JSON file."""
+    return get_trusted_domains().domains
+
+
+_result_cache: Optional[TTLCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> TTLCache:
+    """TTL cache of raw Tavily results, persisted when ``CACHE_DB_PATH`` is set."""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                backend = (
+                    SQLiteCacheBackend(settings.CACHE_DB_PATH, "tavily_cache")
+                    if settings.CACHE_DB_PATH
+                    else None
+                )
+                _result_cache = TTLCache(
+                    max_entries=settings.TAVILY_CACHE_MAX_ENTRIES,
+                    ttl=settings.TAVILY_CACHE_TTL,
+                    backend=backend,
+                )
+    return _result_cache
+
+
+def _tavily_request(
+    query: str, max_results: int
+) -> Tuple[str, Dict[str, str], Dict[str, Any], str]:
+    """Build the URL, headers, payload and cache key for a Tavily news search."""
     api_key = os.getenv("TAVILY_API_KEY")
     if not api_key:
         raise ValueError("TAVILY_API_KEY not set in environment")
 
-    trusted_domains = load_trusted_domains()
-    url = "https://api.tavily.com/search"
+    trusted = get_trusted_domains() if settings.TAVILY_SEND_DOMAINS else None
+    url = f"{settings.TAVILY_BASE_URL}/search"
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
@@ -31,22 +110,60 @@ def call_tavily_api(query: str, max_results: int = 3) -> List[NewsResult]:
     payload = {
         "query": query,
         "num_results": max_results,
-        "search_type": "news",
-        "include_domains": trusted_domains if trusted_domains else None,
+        "search_type": SEARCH_TYPE,
+        "include_domains": trusted.domains if trusted else None,
     }
+    cache_key = query_hash(
+        query, max_results, SEARCH_TYPE, trusted.digest if trusted else None
+    )
+    return url, headers, payload, cache_key
 
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        return [
-            NewsResult(
-                title=res.get("title"),
-                url=res.get("url"),
-                content=res.get("content"),
-                score=res.get("score", 0),
-            )
-            for res in data.get("results", [])
-        ]
-    except Exception as e:
-        raise RuntimeError(f"Tavily API error: {e}")
+
+def _cached_results(cache_key: str) -> Optional[List[Dict[str, Any]]]:
+    if not settings.CACHE_ENABLED or settings.TAVILY_CACHE_TTL <= 0:
+        return None
+    return get_result_cache().get(cache_key)
+
+
+def _store_results(cache_key: str, results: List[Dict[str, Any]]) -> None:
+    if settings.CACHE_ENABLED and settings.TAVILY_CACHE_TTL > 0:
+        get_result_cache().set(cache_key, results)
+
+
+def _news_results(results: List[Dict[str, Any]]) -> List[NewsResult]:
+    """Convert raw results, dropping untrusted URLs when filtering is on."""
+    trusted = get_trusted_domains() if settings.WEB_RESULTS_TRUSTED_ONLY else None
+    return [
+        NewsResult(
+            title=res.get("title"),
+            url=res.get("url"),
+            content=res.get("content"),
+            score=res.get("score", 0),
+        )
+        for res in results
+        if trusted is None or trusted.matches_url(res.get("url") or "")
+    ]
+
+
+def call_tavily_api(query: str, max_results: int = 3) -> List[NewsResult]:
+    """Call the Tavily API to search for news articles."""
+    url, headers, payload, cache_key = _tavily_request(query, max_results)
+    results = _cached_results(cache_key)
+    if results is None:
+        data = post_json("Tavily", url, headers=headers, json=payload, timeout=30)
+        results = data.get("results", [])
+        _store_results(cache_key, results)
+    return _news_results(results)
+
+
+async def acall_tavily_api(query: str, max_results: int = 3) -> List[NewsResult]:
+    """Async variant of ``call_tavily_api`` on the shared pooled client."""
+    url, headers, payload, cache_key = _tavily_request(query, max_results)
+    results = _cached_results(cache_key)
+    if results is None:
+        data = await apost_json(
+            "Tavily", url, headers=headers, json=payload, timeout=30
+        )
+        results = data.get("results", [])
+        _store_results(cache_key, results)
+    return _news_results(results)